@@ -19,6 +19,123 @@ class Settings(BaseSettings):
     session_max_size: int = 100
     session_cache_file: str = "data/sessions.json"
     
+    # 活跃会话注册表（进程内复用 Session）
+    session_registry_max_size: int = 1000
+    session_registry_idle_timeout: int = 900  # 空闲 15 分钟后释放
+    session_registry_revalidate: int = 30  # 与 Redis 核对间隔（秒）
+    
+    # 上游请求
+    # 舱壁隔离：每类调用独立的线程池大小（最大在途上游请求数）与最长排队时间（秒）
+    upstream_bulkheads: dict[str, dict[str, float]] = {
+        "auth": {"max_concurrent": 24, "max_wait": 15},
+        "read": {"max_concurrent": 160, "max_wait": 10},
+        "evaluation": {"max_concurrent": 16, "max_wait": 20},
+    }
+    upstream_pool_connections: int = 10  # 缓存的主机连接池数量
+    upstream_pool_maxsize: int = 50  # 每个主机保留的连接数
+    upstream_pool_block: bool = False  # 连接用尽时是否等待空闲连接
+    upstream_pool_host_limits: dict[str, int] = {
+        "jwxt.xisu.edu.cn": 100,
+        "login.xisu.edu.cn": 30,
+    }
+    
+    # 上游限流：按主机组设置最大在途数、每秒请求数、突发量、最长排队时间（秒）
+    upstream_limit_hosts: dict[str, str] = {
+        "jwxt.xisu.edu.cn": "jwxt",
+        "login.xisu.edu.cn": "cas",
+    }
+    upstream_limits: dict[str, dict[str, float]] = {
+        "jwxt": {"max_in_flight": 64, "rps": 40, "burst": 20, "max_wait": 10},
+        "cas": {"max_in_flight": 16, "rps": 10, "burst": 5, "max_wait": 15},
+        "other": {"max_in_flight": 32, "rps": 0, "burst": 10, "max_wait": 10},
+    }
+    
+    # 对冲请求：首个请求慢于近期延迟分位数时再发一次，对冲数不超过请求数的 budget_ratio
+    upstream_hedge: dict[str, float] = {
+        "enabled": True,
+        "percentile": 0.95,
+        "min_delay": 1.0,
+        "budget_ratio": 0.05,
+        "min_samples": 20,
+    }
+    
+    # 上游重试（仅幂等调用）：最大尝试次数、退避基数与上限（秒）、
+    # 单请求重试次数上限、进程级重试令牌（失败扣 1、成功回补 token_ratio，低于一半停止重试）
+    upstream_retry: dict[str, float] = {
+        "enabled": True,
+        "max_attempts": 3,
+        "base_delay": 0.2,
+        "max_delay": 2.0,
+        "per_request": 2,
+        "max_tokens": 10,
+        "token_ratio": 0.1,
+    }
+    
+    # 上游熔断：连续失败次数阈值、打开持续时间（秒）、半开探测数
+    upstream_breaker: dict[str, float] = {
+        "failure_threshold": 5,
+        "open_seconds": 30,
+        "half_open_probes": 1,
+    }
+    
+    # 登录合并
+    login_lock_ttl: int = 60  # 跨 worker 登录锁有效期（秒）
+    login_result_ttl: int = 15  # 登录结果供其他 worker 复用的时间（秒）
+    login_result_secret: str = ""  # 登录结果校验值的 HMAC 密钥，为空时使用 login_secret_file（不存在时自动生成）
+    login_secret_file: str = "data/login_secret"
+    
+    # 入口准入控制：每类路由的最大在途请求数与最大预计等待（秒）
+    admission_limits: dict[str, dict[str, float]] = {
+        "auth": {"max_in_flight": 50, "max_wait": 10},
+        "read": {"max_in_flight": 200, "max_wait": 8},
+        "evaluation": {"max_in_flight": 20, "max_wait": 30},
+    }
+    admission_routes: dict[str, str] = {
+        "/auth": "auth",
+        "/course": "read",
+        "/grade": "read",
+        "/exam": "read",
+        "/semester": "read",
+        "/user": "read",
+        "/dashboard": "read",
+        "/batch": "read",
+        "/evaluation": "evaluation",
+    }  # 路径前缀 -> 路由类别，未列出的路径不受控
+    admission_stale_ttl: int = 600  # 拒绝时可返回的旧结果最长保留时间（秒）
+    
+    # 解析结果缓存：各数据集有效期（秒），0 表示不缓存
+    result_cache_ttls: dict[str, int] = {
+        "course": 6 * 3600,
+        "grade": 1800,
+        "exam": 3600,
+        "evaluation": 300,
+    }
+    result_cache_max_entries: int = 5000  # 进程内最多缓存条数
+    result_cache_empty_ttl: int = 60  # 列表为空的结果的有效期（秒），0 为不缓存
+    
+    # 全局学期目录：有效期（秒），以及学期切换日（MM-DD，跨过后立即刷新当前学期）
+    semester_catalog_ttl: int = 6 * 3600
+    semester_boundaries: list[str] = ["01-10", "02-20", "07-01", "09-01"]
+    
+    # 页面解析结果记忆：最多记住的解析结果数（0 为关闭）
+    parse_memo_max_entries: int = 512
+    
+    # 学生档案存储：Redis 不可用时的本地文件，以及后台复核间隔（秒）
+    profile_store_file: str = "data/profiles.json"
+    profile_recheck_interval: int = 7 * 24 * 3600
+    
+    # 自动评教：同时评教的课程数、每秒最多开始评教的课程数
+    evaluation_concurrency: int = 4
+    evaluation_rate: float = 3.0
+    
+    # 请求截止时间：请求内所有上游调用共享的总时间预算（秒）
+    # 调用方可通过 X-Deadline-Ms 请求头传入自己剩余的时间
+    default_deadline: float = 28.0  # 略小于 NestJS 端 30 秒超时
+    route_deadlines: dict[str, float] = {
+        "/evaluation/auto": 120.0,
+        "/evaluation/auto/stream": 600.0,  # 进度流有保活，可以跑得更久
+    }  # 按路径前缀覆盖（最长前缀优先）
+    
     # 登录相关
     login_error_keywords: list[str] = [
         "登录", "统一身份认证", "未登录", "请确认已登录", 
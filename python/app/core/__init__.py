@@ -9,10 +9,12 @@ from .semester import SemesterService
 from .user import UserService
 from .exam import ExamService
 from .jwxt import JwxtClient
+from .errors import UpstreamError, UpstreamBusy, UpstreamUnavailable, DeadlineExceeded
 
 __all__ = [
     "CASAuth", "AuthError",
     "CourseService", "GradeService", 
     "SemesterService", "UserService",
-    "ExamService", "JwxtClient"
+    "ExamService", "JwxtClient",
+    "UpstreamError", "UpstreamBusy", "UpstreamUnavailable", "DeadlineExceeded"
 ]
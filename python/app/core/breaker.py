@@ -0,0 +1,97 @@
+"""
+上游熔断器
+
+按主机组统计连续失败（连接错误、超时、5xx）：
+- closed：正常放行，连续失败达到阈值后打开
+- open：直接抛出 UpstreamUnavailable，不再等待超时
+- half_open：打开一段时间后放行少量探测请求，成功则关闭，失败则重新打开
+"""
+
+import threading
+import time
+from typing import Dict
+
+from .errors import UpstreamUnavailable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """单个主机组的熔断器"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, open_seconds: float = 30, half_open_probes: int = 1):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._open_seconds = open_seconds
+        self._half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+        self._trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._open_seconds:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """调用前检查，熔断时抛出 UpstreamUnavailable"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self._half_open_probes:
+                self._probes += 1
+                return
+            self._rejected += 1
+        raise UpstreamUnavailable(f"教务系统暂时不可用（{self.name}），请稍后重试")
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._state = CLOSED
+                self._probes = 0
+
+    def on_abandon(self) -> None:
+        """调用未真正到达上游（排队被拒、被取消），归还半开探测名额"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def on_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self._failure_threshold:
+                if self._state != OPEN:
+                    self._trips += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probes = 0
+
+    def retry_after(self) -> int:
+        """距离下一次半开探测的秒数"""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0
+            return int(max(self._open_seconds - (time.monotonic() - self._opened_at), 1))
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "trips": self._trips,
+                "rejected": self._rejected,
+            }
@@ -0,0 +1,74 @@
+"""
+上游调用舱壁隔离
+
+登录（CAS 多次跳转）、数据查询、评教提交各自使用独立的线程池和并发上限，
+某一类调用激增时只会耗尽自己的名额，不会拖垮其他类别。
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional
+
+from .errors import UpstreamBusy
+from .limiter import Gate
+
+
+class Bulkhead:
+    """单个调用类别的线程池与并发上限"""
+
+    def __init__(self, name: str, max_concurrent: int = 32, max_wait: float = 10):
+        self.name = name
+        self._max_concurrent = max(max_concurrent, 1)
+        self._max_wait = max_wait
+        self._gate = Gate(self._max_concurrent)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self._max_concurrent,
+            thread_name_prefix=f"upstream-{name}"
+        )
+        self._lock = threading.Lock()
+        self._peak = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._waits: Deque[float] = deque(maxlen=1000)
+
+    @property
+    def max_concurrent(self) -> int:
+        return self._max_concurrent
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """占用一个名额，排队超过 max_wait（不超过配置值）时抛出 UpstreamBusy"""
+        max_wait = self._max_wait if max_wait is None else min(max_wait, self._max_wait)
+        t0 = time.monotonic()
+        if not await self._gate.acquire(max(max_wait, 0)):
+            with self._lock:
+                self._rejected += 1
+            raise UpstreamBusy(f"上游繁忙（{self.name}），请稍后重试")
+
+        with self._lock:
+            self._admitted += 1
+            self._waits.append(time.monotonic() - t0)
+            self._peak = max(self._peak, self._gate.active)
+
+    def release(self) -> None:
+        """归还名额（线程安全，可在线程池的完成回调中调用）"""
+        self._gate.release()
+
+    def get_stats(self) -> Dict:
+        """获取统计：在途、排队与等待时间"""
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                "max_concurrent": self._max_concurrent,
+                "max_wait": self._max_wait,
+                "in_flight": self._gate.active,
+                "peak_in_flight": self._peak,
+                "queued": self._gate.waiting,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "wait_p95_ms": 0.0,
+            }
+        if waits:
+            stats["wait_p95_ms"] = round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1)
+        return stats
@@ -7,6 +7,9 @@ from typing import Dict, List, Optional
 import requests
 
 from .constants import JWXT_BASE_URL, TIME_SLOTS, WEEKDAYS, DEFAULT_HEADERS
+from . import upstream
+from .errors import UpstreamError
+from .parse_memo import memoized_parse
 
 
 class CourseService:
@@ -15,31 +18,41 @@ class CourseService:
     def __init__(self, session: requests.Session):
         self.session = session
     
-    def get_table(self, semester_id: str, student_id: str) -> Dict:
-        """获取课程表"""
+    async def get_table(self, semester_id: str, student_id: str) -> Dict:
+        """获取课程表（相同会话的并发查询合并为一次）"""
+        key = ("course_table", id(self.session), semester_id, student_id)
+        return await upstream.coalesce(key, lambda: self._get_table(semester_id, student_id))
+    
+    async def _get_table(self, semester_id: str, student_id: str) -> Dict:
+        """请求并解析课程表（课表页初始化与查询依赖会话状态，同一会话内串行）"""
         try:
-            # 初始化
-            self.session.get(f"{JWXT_BASE_URL}/eams/courseTableForStd.action", timeout=15)
-            
-            headers = {
-                **DEFAULT_HEADERS,
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Origin": JWXT_BASE_URL,
-                "Referer": f"{JWXT_BASE_URL}/eams/courseTableForStd!index.action",
-            }
-            
-            data = {
-                "ignoreHead": "1",
-                "setting.kind": "std",
-                "startWeek": "",
-                "semester.id": semester_id,
-                "ids": student_id,
-            }
-            
-            resp = self.session.post(
-                f"{JWXT_BASE_URL}/eams/courseTableForStd!courseTable.action",
-                headers=headers, data=data, timeout=15
-            )
+            async with upstream.serialized(self.session):
+                # 初始化
+                await upstream.get(self.session, f"{JWXT_BASE_URL}/eams/courseTableForStd.action", memo=True, timeout=15)
+                
+                headers = {
+                    **DEFAULT_HEADERS,
+                    "Content-Type": "application/x-www-form-urlencoded",
+                    "Origin": JWXT_BASE_URL,
+                    "Referer": f"{JWXT_BASE_URL}/eams/courseTableForStd!index.action",
+                }
+                
+                data = {
+                    "ignoreHead": "1",
+                    "setting.kind": "std",
+                    "startWeek": "",
+                    "semester.id": semester_id,
+                    "ids": student_id,
+                }
+                
+                resp = await upstream.post(
+                    self.session,
+                    f"{JWXT_BASE_URL}/eams/courseTableForStd!courseTable.action",
+                    idempotent=True, headers=headers, data=data, timeout=15
+                )
+                
+            if "用户名" in resp.text and "密码" in resp.text:
+                return {"success": False, "error": "需要重新登录"}
             
             raw_courses = self._parse_courses(resp.text)
             
@@ -52,6 +65,8 @@ class CourseService:
                 "total_courses": len(courses),
                 "semester_id": semester_id,
             }
+        except UpstreamError:
+            raise
         except Exception as e:
             return {"success": False, "error": str(e), "courses": []}
     
@@ -86,6 +101,7 @@ class CourseService:
         
         return result
     
+    @memoized_parse(version=1)
     def _parse_courses(self, html: str) -> List[Dict]:
         """解析课程数据"""
         courses = []
@@ -0,0 +1,25 @@
+"""
+上游调用异常
+"""
+
+
+class UpstreamError(Exception):
+    """上游调用异常基类，code 用于向调用方区分失败原因"""
+    code = "UPSTREAM_ERROR"
+    status_code = 503
+
+
+class UpstreamBusy(UpstreamError):
+    """上游并发 / 速率预算已满，排队超时"""
+    code = "UPSTREAM_BUSY"
+
+
+class UpstreamUnavailable(UpstreamError):
+    """熔断器已打开，上游暂不可用，快速失败"""
+    code = "UPSTREAM_UNAVAILABLE"
+
+
+class DeadlineExceeded(UpstreamError):
+    """请求剩余时间不足，跳过或中止上游调用"""
+    code = "DEADLINE_EXCEEDED"
+    status_code = 504
@@ -4,13 +4,17 @@
 
 import re
 import json
-import time
+import asyncio
 import logging
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from bs4 import BeautifulSoup
 import requests
 
+from . import upstream
+from .errors import UpstreamError
+from .limiter import Gate, TokenBucket
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,10 +29,15 @@ class EvaluationService:
     def __init__(self, session: requests.Session):
         self.session = session
     
-    def get_pending_evaluations(self) -> Dict:
-        """获取待评教列表"""
+    async def get_pending_evaluations(self) -> Dict:
+        """获取待评教列表（相同会话的并发查询合并为一次）"""
+        key = ("pending_evaluations", id(self.session))
+        return await upstream.coalesce(key, self._load_pending)
+    
+    async def _load_pending(self) -> Dict:
+        """请求并解析待评教列表"""
         try:
-            resp = self.session.get(self.EVAL_LIST_URL, timeout=30)
+            resp = await upstream.get(self.session, self.EVAL_LIST_URL, timeout=30)
             if resp.status_code != 200:
                 return {"success": False, "error": f"获取评教列表失败，状态码: {resp.status_code}"}
             
@@ -74,14 +83,16 @@ class EvaluationService:
                 "total": len(evaluations),
                 "evaluations": evaluations
             }
+        except UpstreamError:
+            raise
         except Exception as e:
             logger.error(f"获取待评教列表失败: {e}")
             return {"success": False, "error": str(e)}
     
-    def get_questionnaire(self, lesson_id: str) -> Optional[Dict]:
+    async def get_questionnaire(self, lesson_id: str) -> Optional[Dict]:
         """获取评教问卷内容"""
         url = f"{self.EVAL_ANSWER_URL}?evaluationLesson.id={lesson_id}"
-        resp = self.session.get(url, timeout=30)
+        resp = await upstream.get(self.session, url, timeout=30)
         
         if resp.status_code != 200:
             return None
@@ -107,7 +118,7 @@ class EvaluationService:
             "questions": questions
         }
     
-    def submit_evaluation(self, lesson_id: str, semester_id: str, 
+    async def submit_evaluation(self, lesson_id: str, semester_id: str, 
                           questions: List[Dict], choice_index: int = 0,
                           comment: str = "无") -> Dict:
         """
@@ -167,7 +178,7 @@ class EvaluationService:
         post_data["result1Num"] = str(result1_idx)
         post_data["result2Num"] = str(result2_idx)
         
-        resp = self.session.post(self.EVAL_SUBMIT_URL, data=post_data, timeout=30)
+        resp = await upstream.post(self.session, self.EVAL_SUBMIT_URL, data=post_data, timeout=30)
         
         if resp.status_code == 200:
             if "成功" in resp.text or "完成" in resp.text or len(resp.text.strip()) < 500:
@@ -177,14 +188,14 @@ class EvaluationService:
         else:
             return {"success": False, "error": f"提交失败，状态码: {resp.status_code}"}
     
-    def evaluate_single(self, lesson_id: str, choice_index: int = 0, 
+    async def evaluate_single(self, lesson_id: str, choice_index: int = 0, 
                         comment: str = "无") -> Dict:
         """评教单个课程"""
-        questionnaire = self.get_questionnaire(lesson_id)
+        questionnaire = await self.get_questionnaire(lesson_id)
         if not questionnaire:
             return {"success": False, "error": "获取问卷失败"}
         
-        return self.submit_evaluation(
+        return await self.submit_evaluation(
             lesson_id=lesson_id,
             semester_id=questionnaire["semester_id"],
             questions=questionnaire["questions"],
@@ -192,50 +203,92 @@ class EvaluationService:
             comment=comment
         )
     
-    def evaluate_all(self, choice_index: int = 0, comment: str = "无") -> Dict:
-        """自动评教所有待评课程"""
-        results = {
-            "success": True,
-            "total": 0,
-            "succeeded": 0,
-            "failed": 0,
-            "details": []
-        }
+    async def evaluate_all(self, choice_index: int = 0, comment: str = "无",
+                           concurrency: Optional[int] = None, rate: Optional[float] = None) -> Dict:
+        """
+        自动评教所有待评课程
+        
+        各课程的问卷获取和提交有界并发执行，并按速率限制开始新课程，
+        details 仍按待评教列表的顺序返回。
         
+        Args:
+            concurrency: 同时评教的课程数，默认取配置 evaluation_concurrency
+            rate: 每秒最多开始评教的课程数，默认取配置 evaluation_rate
+        """
         # 获取待评教列表
-        pending = self.get_pending_evaluations()
+        pending = await self.get_pending_evaluations()
         if not pending.get("success"):
             return pending
         
         evaluations = pending.get("evaluations", [])
-        results["total"] = len(evaluations)
+        details: List[Optional[Dict]] = [None] * len(evaluations)
+        async for index, detail in self.iter_evaluate(evaluations, choice_index, comment, concurrency, rate):
+            details[index] = detail
+        return self.summarize(details)
+    
+    async def iter_evaluate(self, evaluations: List[Dict], choice_index: int = 0, comment: str = "无",
+                            concurrency: Optional[int] = None,
+                            rate: Optional[float] = None) -> AsyncIterator[Tuple[int, Dict]]:
+        """
+        有界并发评教，按完成顺序逐个产出 (在列表中的下标, 结果明细)
         
-        if not evaluations:
-            results["message"] = "没有待评教的课程"
-            return results
+        调用方提前停止迭代时，尚未完成的课程会被取消。
+        """
+        if concurrency is None or rate is None:
+            from ..config import get_settings
+            settings = get_settings()
+            concurrency = concurrency or settings.evaluation_concurrency
+            rate = settings.evaluation_rate if rate is None else rate
         
-        for eval_info in evaluations:
-            lesson_id = eval_info["lesson_id"]
-            course = f"{eval_info['course_code']} {eval_info['course_name']}"
-            teacher = eval_info['teacher_name']
-            
-            result = self.evaluate_single(lesson_id, choice_index, comment)
-            
-            detail = {
-                "lesson_id": lesson_id,
-                "course": course,
-                "teacher": teacher,
-                "success": result.get("success", False),
-                "message": result.get("message") or result.get("error")
-            }
-            results["details"].append(detail)
-            
-            if result.get("success"):
-                results["succeeded"] += 1
-            else:
-                results["failed"] += 1
-            
-            time.sleep(0.3)
+        gate = Gate(max(concurrency, 1))
+        bucket = TokenBucket(rate, burst=1)
+        
+        async def evaluate(index: int, eval_info: Dict) -> Tuple[int, Dict]:
+            await gate.acquire()
+            try:
+                await bucket.acquire()
+                return index, await self._evaluate_lesson(eval_info, choice_index, comment)
+            finally:
+                gate.release()
         
-        results["message"] = f"评教完成: {results['succeeded']}/{results['total']} 成功"
+        tasks = [asyncio.ensure_future(evaluate(i, e)) for i, e in enumerate(evaluations)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def summarize(details: List[Dict]) -> Dict:
+        """汇总评教结果"""
+        succeeded = sum(1 for d in details if d and d["success"])
+        results = {
+            "success": True,
+            "total": len(details),
+            "succeeded": succeeded,
+            "failed": len(details) - succeeded,
+            "details": details,
+        }
+        if details:
+            results["message"] = f"评教完成: {succeeded}/{len(details)} 成功"
+        else:
+            results["message"] = "没有待评教的课程"
         return results
+    
+    async def _evaluate_lesson(self, eval_info: Dict, choice_index: int, comment: str) -> Dict:
+        """评教单个课程并生成结果明细，失败只影响该课程"""
+        lesson_id = eval_info["lesson_id"]
+        try:
+            result = await self.evaluate_single(lesson_id, choice_index, comment)
+        except Exception as e:
+            logger.error(f"评教课程 {lesson_id} 失败: {e}")
+            result = {"success": False, "error": str(e)}
+        
+        return {
+            "lesson_id": lesson_id,
+            "course": f"{eval_info['course_code']} {eval_info['course_name']}",
+            "teacher": eval_info['teacher_name'],
+            "success": result.get("success", False),
+            "message": result.get("message") or result.get("error")
+        }
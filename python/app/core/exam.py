@@ -8,6 +8,9 @@ import requests
 from bs4 import BeautifulSoup
 
 from .constants import JWXT_BASE_URL, DEFAULT_HEADERS
+from . import upstream
+from .errors import UpstreamError
+from .parse_memo import memoized_parse
 
 
 class ExamService:
@@ -16,16 +19,22 @@ class ExamService:
     def __init__(self, session: requests.Session):
         self.session = session
     
-    def get_exams(self, semester_id: str = None) -> Dict:
-        """获取考试安排"""
+    async def get_exams(self, semester_id: str = None) -> Dict:
+        """获取考试安排（相同会话的并发查询合并为一次）"""
+        key = ("exams", id(self.session), semester_id)
+        return await upstream.coalesce(key, lambda: self._load(semester_id))
+    
+    async def _load(self, semester_id: str = None) -> Dict:
+        """请求并解析考试安排（按学期查询依赖会话状态，同一会话内串行）"""
         try:
-            url = f"{JWXT_BASE_URL}/eams/stdExamTable!examTable.action"
-            
-            params = {}
-            if semester_id:
-                params['semester.id'] = semester_id
-            
-            resp = self.session.get(url, params=params, timeout=15)
+            async with upstream.serialized(self.session):
+                url = f"{JWXT_BASE_URL}/eams/stdExamTable!examTable.action"
+                
+                params = {}
+                if semester_id:
+                    params['semester.id'] = semester_id
+                
+                resp = await upstream.get(self.session, url, params=params, hedge=True, timeout=15)
             resp.raise_for_status()
             
             # 检查是否需要登录
@@ -40,9 +49,12 @@ class ExamService:
                 "total": len(exams),
                 "semester_id": semester_id,
             }
+        except UpstreamError:
+            raise
         except Exception as e:
             return {"success": False, "error": str(e), "exams": []}
     
+    @memoized_parse(version=1)
     def _parse(self, html: str) -> List[Dict]:
         """解析考试表格"""
         soup = BeautifulSoup(html, "html.parser")
@@ -8,6 +8,9 @@ import requests
 from bs4 import BeautifulSoup
 
 from .constants import JWXT_BASE_URL, DEFAULT_HEADERS
+from . import upstream
+from .errors import UpstreamError
+from .parse_memo import memoized_parse
 
 
 class GradeService:
@@ -16,10 +19,10 @@ class GradeService:
     def __init__(self, session: requests.Session):
         self.session = session
     
-    def get_grades(self, semester_id: str = None) -> Dict:
+    async def get_grades(self, semester_id: str = None) -> Dict:
         """获取成绩"""
         if semester_id:
-            return self._fetch(semester_id)
+            return await self._fetch(semester_id)
         
         # 没有指定学期时返回空，让前端选择学期
         return {
@@ -29,26 +32,33 @@ class GradeService:
             "message": "请选择学期"
         }
     
-    def _fetch(self, semester_id: str) -> Dict:
-        """获取指定学期成绩"""
+    async def _fetch(self, semester_id: str) -> Dict:
+        """获取指定学期成绩（相同会话的并发查询合并为一次）"""
+        key = ("grades", id(self.session), semester_id)
+        return await upstream.coalesce(key, lambda: self._load(semester_id))
+    
+    async def _load(self, semester_id: str) -> Dict:
+        """请求并解析指定学期成绩（按学期查询依赖会话状态，同一会话内串行）"""
         try:
-            headers = {
-                **DEFAULT_HEADERS,
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Origin": JWXT_BASE_URL,
-            }
-            
-            data = {
-                "semesterId": semester_id,
-                "projectType": "",
-                "_": str(int(time.time() * 1000)),
-            }
-            
-            resp = self.session.post(
-                f"{JWXT_BASE_URL}/eams/teach/grade/course/person!search.action",
-                headers=headers, data=data, timeout=15
-            )
-            
+            async with upstream.serialized(self.session):
+                headers = {
+                    **DEFAULT_HEADERS,
+                    "Content-Type": "application/x-www-form-urlencoded",
+                    "Origin": JWXT_BASE_URL,
+                }
+                
+                data = {
+                    "semesterId": semester_id,
+                    "projectType": "",
+                    "_": str(int(time.time() * 1000)),
+                }
+                
+                resp = await upstream.post(
+                    self.session,
+                    f"{JWXT_BASE_URL}/eams/teach/grade/course/person!search.action",
+                    idempotent=True, headers=headers, data=data, timeout=15
+                )
+                
             if "用户名" in resp.text and "密码" in resp.text:
                 return {"success": False, "error": "需要重新登录"}
             
@@ -62,9 +72,12 @@ class GradeService:
                 "statistics": stats,
                 "total_courses": len(grades),
             }
+        except UpstreamError:
+            raise
         except Exception as e:
             return {"success": False, "error": str(e), "grades": []}
     
+    @memoized_parse(version=1)
     def _parse(self, html: str) -> List[Dict]:
         """解析成绩表格"""
         soup = BeautifulSoup(html, "html.parser")
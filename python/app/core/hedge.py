@@ -0,0 +1,118 @@
+"""
+对冲请求
+
+对幂等 GET：首个请求超过近期延迟的指定分位数仍未返回时，再发一个相同请求，
+先返回者胜出，另一个被取消。对冲次数受全局预算约束（不超过总请求数的一定比例），
+只会少量增加上游负载。
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyWindow:
+    """最近 N 次成功请求的耗时"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = 1) -> Optional[float]:
+        """p 分位数，样本不足时返回 None"""
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class Hedger:
+    """对冲策略与预算"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        percentile: float = 0.95,
+        min_delay: float = 1.0,
+        budget_ratio: float = 0.05,
+        min_samples: int = 20,
+    ):
+        self.enabled = enabled
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._budget_ratio = budget_ratio
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+        self._eligible = 0
+        self._launched = 0
+        self._backup_wins = 0
+        self._denied = 0
+
+    def delay(self, window: LatencyWindow) -> Optional[float]:
+        """对冲等待时间，None 表示不对冲"""
+        if not self.enabled:
+            return None
+        value = window.percentile(self._percentile, self._min_samples)
+        if value is None:
+            return None
+        return max(value, self._min_delay)
+
+    def _try_spend(self) -> bool:
+        with self._lock:
+            if self._launched + 1 > self._eligible * self._budget_ratio:
+                self._denied += 1
+                return False
+            self._launched += 1
+            return True
+
+    async def run(self, window: LatencyWindow, attempt: Callable[[], Awaitable[T]]) -> T:
+        """执行 attempt，必要时发出对冲请求"""
+        with self._lock:
+            self._eligible += 1
+
+        primary = asyncio.ensure_future(attempt())
+        delay = self.delay(window)
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._try_spend():
+            return await primary
+
+        backup = asyncio.ensure_future(attempt())
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            with self._lock:
+                                self._backup_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # 落败的请求被取消（已在途的线程会跑完，但结果被丢弃）
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "eligible": self._eligible,
+                "launched": self._launched,
+                "backup_wins": self._backup_wins,
+                "budget_denied": self._denied,
+                "budget_ratio": self._budget_ratio,
+            }
@@ -1,5 +1,7 @@
 """
 教务系统客户端 - 统一接口
+
+核心服务均为 async 实现，这里通过 upstream.run_sync 提供同步兼容接口
 """
 
 from typing import Dict, Optional
@@ -11,6 +13,7 @@ from .semester import SemesterService
 from .course import CourseService
 from .grade import GradeService
 from .exam import ExamService
+from .upstream import run_sync
 
 
 class JwxtClient:
@@ -24,7 +27,7 @@ class JwxtClient:
     def login(self, username: str, password: str) -> Dict:
         """登录"""
         try:
-            self.session = self._auth.login(username, password)
+            self.session = run_sync(self._auth.login(username, password))
             self.username = username
             return {"success": True, "message": "登录成功"}
         except AuthError as e:
@@ -41,7 +44,7 @@ class JwxtClient:
             return {"success": False, "error": "未登录"}
         
         service = UserService(self.session)
-        return service.get_info()
+        return run_sync(service.get_info())
     
     def get_semester_info(self) -> Dict:
         """获取学期信息"""
@@ -49,7 +52,7 @@ class JwxtClient:
             return {"success": False, "error": "未登录"}
         
         service = SemesterService(self.session)
-        return service.get_info()
+        return run_sync(service.get_info())
     
     def get_available_semesters(self) -> Dict:
         """获取可用学期列表"""
@@ -57,7 +60,7 @@ class JwxtClient:
             return {"success": False, "error": "未登录"}
         
         service = SemesterService(self.session)
-        return service.get_available()
+        return run_sync(service.get_available())
     
     def get_course_table(self, semester_id: str = None, student_id: str = None) -> Dict:
         """获取课程表"""
@@ -67,18 +70,18 @@ class JwxtClient:
         # 获取学期 ID
         if not semester_id:
             sem_service = SemesterService(self.session)
-            semester_id = sem_service.get_current_id() or "209"
+            semester_id = run_sync(sem_service.get_current_id()) or "209"
         
         # 获取学生 ID
         if not student_id:
             user_service = UserService(self.session)
-            student_id = user_service.get_student_id()
+            student_id = run_sync(user_service.get_student_id())
         
         if not student_id:
             return {"success": False, "error": "无法获取学生 ID"}
         
         service = CourseService(self.session)
-        return service.get_table(semester_id, student_id)
+        return run_sync(service.get_table(semester_id, student_id))
     
     def get_grades(self, semester_id: str = None) -> Dict:
         """获取成绩"""
@@ -86,7 +89,7 @@ class JwxtClient:
             return {"success": False, "error": "未登录"}
         
         service = GradeService(self.session)
-        return service.get_grades(semester_id)
+        return run_sync(service.get_grades(semester_id))
     
     def get_exams(self, semester_id: str = None) -> Dict:
         """获取考试安排"""
@@ -94,4 +97,4 @@ class JwxtClient:
             return {"success": False, "error": "未登录"}
         
         service = ExamService(self.session)
-        return service.get_exams(semester_id)
+        return run_sync(service.get_exams(semester_id))
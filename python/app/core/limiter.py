@@ -0,0 +1,227 @@
+"""
+上游限流
+
+按目标主机分组（jwxt / cas / other），每组有独立的：
+- 最大在途请求数（Gate）
+- 令牌桶速率限制（TokenBucket）
+- 有上限的排队等待时间，超时抛出 UpstreamBusy
+
+同步兼容层使用独立的事件循环，这里的原语不绑定事件循环，
+用线程锁保护状态，通过 call_soon_threadsafe 唤醒等待者。
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .errors import UpstreamBusy
+
+
+class Gate:
+    """不绑定事件循环的计数信号量"""
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, "asyncio.Future"]] = deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """获取名额，timeout 内未获得返回 False"""
+        with self._lock:
+            if self._active < self._limit and not self._waiters:
+                self._active += 1
+                return True
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        future = waiter[1]
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._drop(waiter)
+            # 超时与交接同时发生（3.12+ 的 wait_for 可能在 future 已有结果后仍抛出）：归还
+            if future.done() and not future.cancelled():
+                self.release()
+            return False
+        except BaseException:
+            self._drop(waiter)
+            # 名额已经交给我们但任务被取消：归还
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def _drop(self, waiter) -> None:
+        with self._lock:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def release(self) -> None:
+        """归还名额，优先交给排队中的等待者"""
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                if future.done():
+                    continue
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                except RuntimeError:
+                    # 等待者所在的事件循环已关闭
+                    continue
+            self._active -= 1
+
+    def _hand_over(self, future: "asyncio.Future") -> None:
+        if future.done():
+            # 等待者已放弃，名额继续传递
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class TokenBucket:
+    """令牌桶（预约式，不绑定事件循环）"""
+
+    def __init__(self, rate: float, burst: float):
+        self._rate = rate
+        self._burst = max(burst, 1.0)
+        self._tokens = self._burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """取一个令牌，需要等待的时间超过 timeout 时返回 False"""
+        if self._rate <= 0:
+            return True
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self._rate
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= 1
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+
+class HostLimiter:
+    """单个上游主机组的限流器"""
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int = 64,
+        rps: float = 0,
+        burst: float = 10,
+        max_wait: float = 10,
+    ):
+        self.name = name
+        self._max_in_flight = max_in_flight
+        self._rps = rps
+        self._max_wait = max_wait
+        self._gate = Gate(max_in_flight)
+        self._bucket = TokenBucket(rps, burst)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._rejected = 0
+        self._waits: Deque[float] = deque(maxlen=1000)
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """
+        占用一个上游调用名额，排队超时抛出 UpstreamBusy
+
+        Args:
+            max_wait: 本次最长排队时间，不超过配置值（用于请求截止时间）
+        """
+        max_wait = self._max_wait if max_wait is None else min(max_wait, self._max_wait)
+        t0 = time.monotonic()
+        if not await self._bucket.acquire(max_wait):
+            self._reject()
+        remaining = max_wait - (time.monotonic() - t0)
+        if not await self._gate.acquire(max(remaining, 0)):
+            self._reject()
+
+        with self._lock:
+            self._admitted += 1
+            self._waits.append(time.monotonic() - t0)
+
+    def release(self) -> None:
+        """归还名额（线程安全，可在线程池的完成回调中调用）"""
+        self._gate.release()
+
+    def _reject(self) -> None:
+        with self._lock:
+            self._rejected += 1
+        raise UpstreamBusy(f"上游繁忙（{self.name}），请稍后重试")
+
+    def get_stats(self) -> Dict:
+        """获取统计：排队深度与等待时间"""
+        with self._lock:
+            waits = sorted(self._waits)
+            admitted, rejected = self._admitted, self._rejected
+        stats = {
+            "max_in_flight": self._max_in_flight,
+            "rps": self._rps,
+            "max_wait": self._max_wait,
+            "in_flight": self._gate.active,
+            "queued": self._gate.waiting,
+            "admitted": admitted,
+            "rejected": rejected,
+            "wait_avg_ms": 0.0,
+            "wait_p95_ms": 0.0,
+            "wait_max_ms": 0.0,
+        }
+        if waits:
+            stats["wait_avg_ms"] = round(sum(waits) / len(waits) * 1000, 1)
+            stats["wait_p95_ms"] = round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1)
+            stats["wait_max_ms"] = round(waits[-1] * 1000, 1)
+        return stats
+
+
+class UpstreamLimiter:
+    """按主机分组的上游限流器集合"""
+
+    def __init__(self, limits: Dict[str, Dict[str, float]], hosts: Dict[str, str], default_group: str = "other"):
+        self._hosts = {k.lower(): v for k, v in hosts.items()}
+        self._default_group = default_group
+        self._limiters: Dict[str, HostLimiter] = {}
+        for name, conf in limits.items():
+            self._limiters[name] = HostLimiter(
+                name,
+                max_in_flight=int(conf.get("max_in_flight", 64)),
+                rps=float(conf.get("rps", 0)),
+                burst=float(conf.get("burst", 10)),
+                max_wait=float(conf.get("max_wait", 10)),
+            )
+        if default_group not in self._limiters:
+            self._limiters[default_group] = HostLimiter(default_group)
+
+    def group_for(self, url: str) -> str:
+        """URL 所属的主机组"""
+        host = (urlsplit(url).hostname or "").lower()
+        return self._hosts.get(host, self._default_group)
+
+    def for_url(self, url: str) -> HostLimiter:
+        return self._limiters[self.group_for(url)]
+
+    def get_stats(self) -> Dict:
+        return {name: limiter.get_stats() for name, limiter in self._limiters.items()}
@@ -0,0 +1,94 @@
+"""
+页面解析结果记忆
+
+教务系统经常返回与上次完全相同的页面，而 BeautifulSoup 解析是每个请求的主要 CPU 开销。
+按 (解析器, 解析器版本, 页面内容哈希) 记住解析结果，相同页面直接返回，不再解析。
+修改解析逻辑时递增对应的 version，旧结果自然失效。
+
+返回的是深拷贝，调用方修改结果不会影响记忆的数据。
+"""
+
+import copy
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ParseMemo:
+    """有界 LRU 解析结果记忆"""
+
+    def __init__(self, max_entries: int = 512):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int, bytes], Any]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, parser: str, name: str) -> None:
+        stats = self._stats.setdefault(parser, {"hits": 0, "misses": 0})
+        stats[name] += 1
+
+    def get_or_parse(self, parser: str, version: int, html: str, parse: Callable[[str], Any]) -> Any:
+        """读取记忆的解析结果，未命中时解析并记住"""
+        if self._max_entries <= 0:
+            return parse(html)
+
+        digest = hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        key = (parser, version, digest)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._count(parser, "hits")
+                return copy.deepcopy(self._entries[key])
+            self._count(parser, "misses")
+
+        result = parse(html)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return copy.deepcopy(result)
+
+    def get_stats(self) -> Dict:
+        """获取统计"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "parsers": {name: dict(stats) for name, stats in self._stats.items()},
+            }
+
+
+# 全局实例
+_memo: Optional[ParseMemo] = None
+_memo_lock = threading.Lock()
+
+
+def get_parse_memo() -> ParseMemo:
+    """获取全局解析结果记忆"""
+    global _memo
+    if _memo is None:
+        with _memo_lock:
+            if _memo is None:
+                from ..config import get_settings
+                _memo = ParseMemo(max_entries=get_settings().parse_memo_max_entries)
+    return _memo
+
+
+def memoized_parse(version: int = 1) -> Callable:
+    """
+    装饰解析方法 (self, html) -> result，相同页面只解析一次
+
+    Args:
+        version: 解析器版本，修改解析逻辑时递增
+    """
+    def decorator(method: Callable) -> Callable:
+        parser = method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, html: str):
+            return get_parse_memo().get_or_parse(parser, version, html, lambda text: method(self, text))
+        return wrapper
+    return decorator
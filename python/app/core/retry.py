@@ -0,0 +1,135 @@
+"""
+上游重试
+
+只用于幂等调用（GET 和标记为只读的 POST）：连接错误、超时、502/503/504 时
+按指数退避 + 随机抖动重试。重试受两级预算约束：
+- 单个 API 请求内的重试次数上限
+- 进程级重试令牌（失败扣减、成功回补），上游持续故障时自动停止重试，避免放大流量
+"""
+
+import asyncio
+import logging
+import random
+import threading
+from typing import Awaitable, Callable, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 可重试的上游状态码
+RETRY_STATUSES = {502, 503, 504}
+
+
+class RetryPolicy:
+    """重试策略与预算"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        per_request: int = 2,
+        max_tokens: float = 10,
+        token_ratio: float = 0.1,
+    ):
+        self.enabled = enabled
+        self._max_attempts = max(max_attempts, 1)
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._per_request = per_request
+        self._max_tokens = max_tokens
+        self._token_ratio = token_ratio
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+        self._retried = 0
+        self._recovered = 0
+        self._denied = 0
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（全抖动）"""
+        cap = min(self._max_delay, self._base_delay * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def _on_result(self, failed: bool) -> None:
+        with self._lock:
+            if failed:
+                self._tokens = max(self._tokens - 1, 0)
+            else:
+                self._tokens = min(self._tokens + self._token_ratio, self._max_tokens)
+
+    def _try_spend(self, scope) -> bool:
+        """进程令牌高于一半且请求内次数未用完时允许重试"""
+        with self._lock:
+            if self._tokens <= self._max_tokens / 2:
+                self._denied += 1
+                return False
+            if scope is not None and scope.retries >= self._per_request:
+                self._denied += 1
+                return False
+            self._retried += 1
+        if scope is not None:
+            scope.retries += 1
+        return True
+
+    async def run(
+        self,
+        attempt: Callable[[], Awaitable[requests.Response]],
+        scope=None,
+        remaining: Callable[[], Optional[float]] = lambda: None,
+    ) -> requests.Response:
+        """
+        执行 attempt，失败时按策略重试
+
+        Args:
+            scope: 当前请求作用域，用于请求内重试计数
+            remaining: 返回请求剩余时间（秒），退避后剩余时间不足时不再重试
+        """
+        n = 0
+        while True:
+            try:
+                resp = await attempt()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._on_result(failed=True)
+                if not await self._wait_retry(n, scope, remaining):
+                    raise
+                logger.info(f"[retry] {type(e).__name__}, retry #{n + 1}")
+                n += 1
+                continue
+
+            failed = resp.status_code in RETRY_STATUSES
+            self._on_result(failed)
+            if not failed:
+                if n > 0:
+                    with self._lock:
+                        self._recovered += 1
+                return resp
+            if not await self._wait_retry(n, scope, remaining):
+                return resp
+            logger.info(f"[retry] HTTP {resp.status_code}, retry #{n + 1}")
+            n += 1
+
+    async def _wait_retry(self, n: int, scope, remaining: Callable[[], Optional[float]]) -> bool:
+        """判断能否进行第 n+1 次重试，可以则完成退避等待"""
+        if not self.enabled or n + 1 >= self._max_attempts:
+            return False
+        delay = self.backoff(n)
+        left = remaining()
+        if left is not None and left - delay < 1.0:
+            return False
+        if not self._try_spend(scope):
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "retried": self._retried,
+                "recovered": self._recovered,
+                "budget_denied": self._denied,
+                "tokens": round(self._tokens, 2),
+                "max_tokens": self._max_tokens,
+            }
@@ -3,11 +3,24 @@
 """
 
 import re
-from typing import Dict, Optional
+import asyncio
+import logging
+import threading
+from collections import Counter
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 import requests
 from bs4 import BeautifulSoup
 
 from .constants import JWXT_BASE_URL
+from . import upstream
+from .errors import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# 当前学期探测来源命中统计
+_probe_wins: Counter = Counter()
+_probe_lock = threading.Lock()
 
 
 class SemesterService:
@@ -16,41 +29,102 @@ class SemesterService:
     def __init__(self, session: requests.Session):
         self.session = session
     
-    def get_current_id(self) -> Optional[str]:
+    PROBE_URLS = {
+        "course_table": f"{JWXT_BASE_URL}/eams/courseTableForStd.action",
+        "home": f"{JWXT_BASE_URL}/eams/home.action",
+        "grade_search": f"{JWXT_BASE_URL}/eams/teach/grade/course/person!search.action",
+    }
+    
+    PATTERNS = [
+        r'semester\.id["\']?\s*[:=]\s*["\']?(\d+)',
+        r'semesterId["\']?\s*[:=]\s*["\']?(\d+)',
+        r'id="semester"[^>]*value="(\d+)"',
+        r'name="semester\.id"[^>]*value="(\d+)"',
+    ]
+    
+    async def get_current_id(self, race: bool = False) -> Optional[str]:
         """获取当前学期 ID"""
+        semester_id, _ = await self.probe_current_id(race)
+        return semester_id
+    
+    async def probe_current_id(self, race: bool = False) -> Tuple[Optional[str], Optional[str]]:
+        """
+        探测当前学期 ID
+        
+        Args:
+            race: 为 True 时并发发起全部页面探测，取第一个有效结果并取消其余探测；
+                  否则按顺序逐个尝试
+        
+        Returns:
+            (semester_id, 命中的探测来源) 元组
+        """
+        # 当前学期属于会话状态，与按学期查询的调用串行，避免读到其他请求切换后的学期
+        async with upstream.serialized(self.session):
+            return await self._probe_current_id(race)
+    
+    async def _probe_current_id(self, race: bool) -> Tuple[Optional[str], Optional[str]]:
+        """依次从 cookie、页面、dataQuery 接口探测当前学期"""
         # 1. 从 cookie 获取
         for cookie in self.session.cookies:
             if cookie.name == "semester.id":
-                return cookie.value
+                return self._record("cookie", cookie.value)
         
-        # 2. 从页面提取
-        urls = [
-            f"{JWXT_BASE_URL}/eams/courseTableForStd.action",
-            f"{JWXT_BASE_URL}/eams/home.action",
-            f"{JWXT_BASE_URL}/eams/teach/grade/course/person!search.action",
+        # 探测按需创建，顺序探测提前返回或抛出异常时不会留下未执行的协程
+        probes: List[Tuple[str, Callable[[], Awaitable]]] = [
+            (name, partial(self._probe_page, url)) for name, url in self.PROBE_URLS.items()
         ]
+        probes.append(("data_query", self._probe_data_query))
         
-        patterns = [
-            r'semester\.id["\']?\s*[:=]\s*["\']?(\d+)',
-            r'semesterId["\']?\s*[:=]\s*["\']?(\d+)',
-            r'id="semester"[^>]*value="(\d+)"',
-            r'name="semester\.id"[^>]*value="(\d+)"',
-        ]
+        if race:
+            return self._record(*await self._race(probes))
         
-        for url in urls:
-            try:
-                resp = self.session.get(url, timeout=15)
-                for pattern in patterns:
-                    match = re.search(pattern, resp.text, re.IGNORECASE)
-                    if match:
-                        return match.group(1)
-            except Exception:
-                continue
+        # 2. 从页面提取，3. 从 dataQuery 接口获取带 selected 标记的学期
+        for name, probe in probes:
+            semester_id = await probe()
+            if semester_id:
+                return self._record(name, semester_id)
         
-        # 3. 从 dataQuery 接口获取带 selected 标记的学期
+        return self._record(None, None)
+    
+    async def _race(self, probes: List[Tuple[str, Callable[[], Awaitable]]]) -> Tuple[Optional[str], Optional[str]]:
+        """并发执行探测，返回第一个有效结果"""
+        order = [name for name, _ in probes]
+        pending = {asyncio.ensure_future(probe()): name for name, probe in probes}
         try:
-            resp = self.session.post(
+            while pending:
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+                # 同一轮完成多个时按探测优先级取
+                for task in sorted(done, key=lambda t: order.index(pending[t])):
+                    name = pending.pop(task)
+                    semester_id = task.result()
+                    if semester_id:
+                        return name, semester_id
+        finally:
+            for task in pending:
+                task.cancel()
+        return None, None
+    
+    async def _probe_page(self, url: str) -> Optional[str]:
+        """从页面中匹配学期 ID"""
+        try:
+            resp = await upstream.get(self.session, url, memo=True, timeout=15)
+            for pattern in self.PATTERNS:
+                match = re.search(pattern, resp.text, re.IGNORECASE)
+                if match:
+                    return match.group(1)
+        except UpstreamError:
+            raise
+        except Exception:
+            pass
+        return None
+    
+    async def _probe_data_query(self) -> Optional[str]:
+        """从 dataQuery 接口获取带 selected 标记的学期"""
+        try:
+            resp = await upstream.post(
+                self.session,
                 f"{JWXT_BASE_URL}/eams/dataQuery.action",
+                idempotent=True,
                 data={"dataType": "semester"},
                 timeout=15
             )
@@ -59,17 +133,40 @@ class SemesterService:
             selected = soup.find("option", selected=True)
             if selected and selected.get("value", "").strip().isdigit():
                 return selected.get("value").strip()
+        except UpstreamError:
+            raise
         except Exception:
             pass
-        
         return None
     
-    def get_available(self) -> Dict:
-        """获取可用学期列表"""
+    @staticmethod
+    def _record(source: Optional[str], semester_id: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """记录命中的探测来源"""
+        with _probe_lock:
+            _probe_wins[source or "none"] += 1
+        logger.debug(f"[semester] current id {semester_id} from {source}")
+        return semester_id, source
+    
+    @staticmethod
+    def get_probe_stats() -> Dict[str, int]:
+        """各探测来源的命中次数"""
+        with _probe_lock:
+            return dict(_probe_wins)
+    
+    async def get_available(self, probe_current: bool = True) -> Dict:
+        """
+        获取可用学期列表
+        
+        Args:
+            probe_current: 没有 selected 标记时是否用 get_current_id 兜底。
+                兜底结果来自本会话的 cookie / 页面，属于会话状态，全局共享的数据应传 False
+        """
         try:
             # 通过 dataQuery 接口获取学期列表
-            resp = self.session.post(
+            resp = await upstream.post(
+                self.session,
                 f"{JWXT_BASE_URL}/eams/dataQuery.action",
+                idempotent=True,
                 data={"dataType": "semester"},
                 timeout=15
             )
@@ -89,8 +186,8 @@ class SemesterService:
                     semesters.append(sem)
             
             # 如果没从 selected 属性找到当前学期，用 get_current_id 兜底
-            if not current:
-                current = self.get_current_id()
+            if not current and probe_current:
+                current = await self.get_current_id()
                 for sem in semesters:
                     if sem["id"] == current:
                         sem["current"] = True
@@ -103,6 +200,8 @@ class SemesterService:
                 "semesters": semesters,
                 "current_semester": current,
             }
+        except UpstreamError:
+            raise
         except Exception as e:
             return {
                 "success": False,
@@ -110,9 +209,9 @@ class SemesterService:
                 "semesters": [],
             }
     
-    def get_info(self) -> Dict:
+    async def get_info(self) -> Dict:
         """获取学期详细信息"""
-        available = self.get_available()
+        available = await self.get_available()
         
         return {
             "success": True,
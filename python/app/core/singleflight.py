@@ -0,0 +1,55 @@
+"""
+跨请求的 single-flight 合并
+
+相同 key 的并发调用只执行一次，其余调用方等待同一个结果。
+只合并"正在进行"的调用，完成后立即移除，不做缓存。
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """single-flight 调用组"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, "asyncio.Future"] = {}
+        self._executed = 0
+        self._shared = 0
+
+    async def do(self, key: Any, factory: Callable[[], Awaitable[T]]) -> T:
+        """执行或加入相同 key 的在途调用"""
+        # future 绑定事件循环，key 中带上循环标识避免跨循环共享
+        full_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            future = self._calls.get(full_key)
+            if future is None:
+                future = asyncio.ensure_future(factory())
+                self._calls[full_key] = future
+                self._executed += 1
+                future.add_done_callback(lambda f: self._forget(full_key, f))
+            else:
+                self._shared += 1
+        # shield：单个调用方被取消不影响在途调用和其他等待者
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Any, future: "asyncio.Future") -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def get_stats(self) -> Dict:
+        """获取统计：executed 为实际执行次数，shared 为合并掉的调用次数"""
+        with self._lock:
+            total = self._executed + self._shared
+            return {
+                "in_flight": len(self._calls),
+                "executed": self._executed,
+                "shared": self._shared,
+                "share_ratio": round(self._shared / total, 4) if total else 0.0,
+            }
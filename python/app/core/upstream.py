@@ -0,0 +1,719 @@
+"""
+上游请求引擎
+
+所有对教务系统 / CAS 的 HTTP 调用都经过这里。
+requests 是阻塞库，这里把每次调用放进专用线程池执行，
+核心服务以 async 方式 await，不再阻塞 uvicorn 事件循环。
+
+所有 Session 共享同一个连接池（PooledAdapter），Cookie 仍随各自的
+Session 按请求携带，热请求可以直接复用已建立的 TCP/TLS 连接。
+
+每个 API 请求对应一个 RequestScope，同一请求内标记 memo=True 的相同
+GET 只访问一次教务系统。跨请求的相同只读调用（GET 与标记 idempotent
+的 POST）通过 single-flight 合并为一次在途请求。标记 hedge=True 的 GET
+在慢于近期延迟分位数时发出对冲请求。幂等调用遇到连接错误、超时和
+502/503/504 时按退避策略重试（见 retry.py）。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.poolmanager import PoolManager
+
+from .breaker import CircuitBreaker
+from .bulkhead import Bulkhead
+from .errors import DeadlineExceeded, UpstreamBusy
+from .hedge import Hedger, LatencyWindow
+from .limiter import Gate, HostLimiter, UpstreamLimiter
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 未指定舱壁时使用的调用类别
+DEFAULT_BULKHEAD = "read"
+
+# 不参与合并 key 的防缓存参数
+CACHE_BUSTER_PARAMS = {"_"}
+
+# 剩余时间低于该值（秒）时不再发起上游调用
+MIN_CALL_BUDGET = 0.5
+
+
+class _HostLimitedPoolManager(PoolManager):
+    """按主机设置连接池大小的 PoolManager"""
+
+    def __init__(self, *args, host_limits: Optional[Dict[str, int]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._host_limits = host_limits or {}
+
+    def connection_from_host(self, host, port=None, scheme="http", pool_kwargs=None):
+        limit = self._host_limits.get((host or "").lower())
+        if limit:
+            pool_kwargs = {**(pool_kwargs or {}), "maxsize": limit}
+        return super().connection_from_host(host, port=port, scheme=scheme, pool_kwargs=pool_kwargs)
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    进程级共享的连接池适配器
+
+    挂载到每个 Session 上，连接按主机复用（keep-alive），
+    Session.close() 不会关闭共享连接池。
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 50,
+        pool_block: bool = False,
+        host_limits: Optional[Dict[str, int]] = None,
+    ):
+        self._host_limits = {k.lower(): v for k, v in (host_limits or {}).items()}
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _HostLimitedPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            host_limits=self._host_limits,
+            **pool_kwargs,
+        )
+
+    def close(self):
+        """共享适配器不随单个 Session 关闭"""
+        pass
+
+    def shutdown(self):
+        """关闭全部连接（进程退出时调用）"""
+        super().close()
+
+    def get_stats(self) -> Dict:
+        """获取各主机连接池统计"""
+        hosts = {}
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            queue = getattr(pool, "pool", None)
+            idle = sum(1 for conn in list(queue.queue) if conn is not None) if queue else 0
+            opened = pool.num_connections
+            requests_sent = pool.num_requests
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "maxsize": queue.maxsize if queue else 0,
+                "opened": opened,
+                "idle": idle,
+                "requests": requests_sent,
+                "reused": max(requests_sent - opened, 0),
+            }
+        return {
+            "pool_maxsize": self._pool_maxsize,
+            "pool_block": self._pool_block,
+            "host_limits": self._host_limits,
+            "hosts": hosts,
+        }
+
+
+_adapter: Optional[PooledAdapter] = None
+_adapter_lock = threading.Lock()
+
+
+def get_adapter() -> PooledAdapter:
+    """获取全局共享连接池"""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                from ..config import get_settings
+                settings = get_settings()
+                _adapter = PooledAdapter(
+                    pool_connections=settings.upstream_pool_connections,
+                    pool_maxsize=settings.upstream_pool_maxsize,
+                    pool_block=settings.upstream_pool_block,
+                    host_limits=settings.upstream_pool_host_limits,
+                )
+    return _adapter
+
+
+def close_adapter() -> None:
+    """关闭全局连接池（应用关闭时调用，未创建时不做任何事）"""
+    global _adapter
+    with _adapter_lock:
+        adapter, _adapter = _adapter, None
+    if adapter is not None:
+        adapter.shutdown()
+
+
+def new_session(cookies: Optional[Dict[str, str]] = None) -> requests.Session:
+    """创建挂载共享连接池的 Session"""
+    session = requests.Session()
+    adapter = get_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if cookies:
+        for name, value in cookies.items():
+            session.cookies.set(name, value)
+    return session
+
+
+class UpstreamEngine:
+    """上游请求引擎"""
+
+    def __init__(
+        self,
+        bulkheads: Optional[Dict[str, Dict[str, float]]] = None,
+        limiter: Optional[UpstreamLimiter] = None,
+        breaker_config: Optional[Dict[str, float]] = None,
+    ):
+        self._bulkheads: Dict[str, Bulkhead] = {
+            name: Bulkhead(
+                name,
+                max_concurrent=int(conf.get("max_concurrent", 32)),
+                max_wait=float(conf.get("max_wait", 10)),
+            )
+            for name, conf in (bulkheads or {}).items()
+        }
+        if DEFAULT_BULKHEAD not in self._bulkheads:
+            self._bulkheads[DEFAULT_BULKHEAD] = Bulkhead(DEFAULT_BULKHEAD, max_concurrent=200)
+        self._limiter = limiter or UpstreamLimiter({}, {})
+        self._breaker_config = breaker_config or {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyWindow] = {}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._total = 0
+        self._errors = 0
+
+    async def request(
+        self,
+        session: requests.Session,
+        method: str,
+        url: str,
+        **kwargs
+    ) -> requests.Response:
+        """
+        在线程池中执行一次上游请求
+
+        先经过所属主机组的熔断器（打开时快速失败），再依次占用当前调用类别的
+        舱壁名额和主机组限流名额，最后在该舱壁的线程池中执行；名额在线程中的调用结束时归还。
+        连接错误、超时和 5xx 计为熔断失败。
+        在请求作用域内时，排队和超时都不超过请求的剩余时间。
+        """
+        scope = current_scope()
+        remaining = scope.remaining() if scope else None
+        if remaining is not None and remaining < MIN_CALL_BUDGET:
+            raise DeadlineExceeded("请求剩余时间不足，已跳过上游调用")
+
+        bulkhead = self.bulkhead_for(_current_bulkhead.get())
+        limiter = self._limiter.for_url(url)
+        breaker = self.breaker_for(url)
+        breaker.before_call()
+        clamped = False
+        try:
+            await bulkhead.acquire(remaining)
+            try:
+                await limiter.acquire(remaining)
+            except BaseException:
+                bulkhead.release()
+                raise
+            try:
+                if scope:
+                    remaining = scope.remaining()
+                    if remaining is not None:
+                        if remaining < MIN_CALL_BUDGET:
+                            raise DeadlineExceeded("请求剩余时间不足，已跳过上游调用")
+                        timeout = kwargs.get("timeout")
+                        if timeout is None or timeout > remaining:
+                            kwargs["timeout"] = remaining
+                            clamped = True
+                future = bulkhead.executor.submit(session.request, method, url, **kwargs)
+            except BaseException:
+                limiter.release()
+                bulkhead.release()
+                raise
+
+            with self._lock:
+                self._in_flight += 1
+                self._total += 1
+                self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            # 名额在线程中的调用真正结束时才归还：调用方被取消（如对冲落败）后线程仍在请求上游，
+            # 提前归还会低估上游负载，新请求也会在线程池队列里不受截止时间约束地等待
+            future.add_done_callback(lambda _: self._finish(bulkhead, limiter))
+            started = time.monotonic()
+            try:
+                resp = await asyncio.wrap_future(future)
+            except Exception:
+                with self._lock:
+                    self._errors += 1
+                raise
+        except requests.Timeout as e:
+            if clamped:
+                # 超时来自请求截止时间，不计入熔断
+                breaker.on_abandon()
+                raise DeadlineExceeded("请求已到截止时间，上游调用中止") from e
+            breaker.on_failure()
+            raise
+        except requests.RequestException:
+            breaker.on_failure()
+            raise
+        except UpstreamBusy:
+            breaker.on_abandon()
+            if remaining is not None and scope and scope.remaining() < MIN_CALL_BUDGET:
+                raise DeadlineExceeded("请求剩余时间不足，排队已放弃")
+            raise
+        except BaseException:
+            breaker.on_abandon()
+            raise
+
+        if resp.status_code >= 500:
+            breaker.on_failure()
+        else:
+            breaker.on_success()
+            self.latency_window(url).record(time.monotonic() - started)
+        return resp
+
+    def _finish(self, bulkhead: Bulkhead, limiter: HostLimiter) -> None:
+        """线程中的上游调用结束：归还名额"""
+        with self._lock:
+            self._in_flight -= 1
+        limiter.release()
+        bulkhead.release()
+
+    def latency_window(self, url: str) -> LatencyWindow:
+        """URL 所属主机组的近期延迟"""
+        group = self._limiter.group_for(url)
+        window = self._latency.get(group)
+        if window is None:
+            with self._lock:
+                window = self._latency.setdefault(group, LatencyWindow())
+        return window
+
+    def get_latency_stats(self) -> Dict:
+        """各主机组近期延迟分位数（毫秒）"""
+        stats = {}
+        for group, window in list(self._latency.items()):
+            p50, p95 = window.percentile(0.5), window.percentile(0.95)
+            stats[group] = {
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            }
+        return stats
+
+    def breaker_for(self, url: str) -> CircuitBreaker:
+        """URL 所属主机组的熔断器"""
+        group = self._limiter.group_for(url)
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(group, CircuitBreaker(
+                    group,
+                    failure_threshold=int(self._breaker_config.get("failure_threshold", 5)),
+                    open_seconds=float(self._breaker_config.get("open_seconds", 30)),
+                    half_open_probes=int(self._breaker_config.get("half_open_probes", 1)),
+                ))
+        return breaker
+
+    def bulkhead_for(self, name: Optional[str]) -> Bulkhead:
+        """调用类别对应的舱壁，未配置的类别使用默认舱壁"""
+        return self._bulkheads.get(name or DEFAULT_BULKHEAD) or self._bulkheads[DEFAULT_BULKHEAD]
+
+    def get_bulkhead_stats(self) -> Dict:
+        """各调用类别的舱壁统计"""
+        return {name: bulkhead.get_stats() for name, bulkhead in self._bulkheads.items()}
+
+    def retry_after(self) -> int:
+        """所有已打开熔断器中最长的剩余时间（秒）"""
+        return max((b.retry_after() for b in list(self._breakers.values())), default=0)
+
+    def get_breaker_stats(self) -> Dict:
+        """各主机组熔断器状态"""
+        return {group: breaker.get_stats() for group, breaker in list(self._breakers.items())}
+
+    def get_stats(self) -> Dict:
+        """获取引擎统计"""
+        with self._lock:
+            return {
+                "max_workers": sum(b.max_concurrent for b in self._bulkheads.values()),
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "total_requests": self._total,
+                "errors": self._errors,
+            }
+
+    def get_limiter_stats(self) -> Dict:
+        """获取各主机组限流统计"""
+        return self._limiter.get_stats()
+
+
+# 全局引擎实例
+_engine: Optional[UpstreamEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> UpstreamEngine:
+    """获取全局上游引擎"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                from ..config import get_settings
+                settings = get_settings()
+                _engine = UpstreamEngine(
+                    bulkheads=settings.upstream_bulkheads,
+                    limiter=UpstreamLimiter(settings.upstream_limits, settings.upstream_limit_hosts),
+                    breaker_config=settings.upstream_breaker,
+                )
+    return _engine
+
+
+# ---------------------------------------------------------------------------
+# 请求作用域
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RequestScope:
+    """单个 API 请求的上游调用上下文"""
+    memo: Dict[Any, "asyncio.Future"] = field(default_factory=dict)
+    memo_hits: int = 0
+    deadline: Optional[float] = None  # time.monotonic() 时间点
+    retries: int = 0  # 本请求已用的上游重试次数
+
+    def remaining(self) -> Optional[float]:
+        """剩余时间（秒），未设置截止时间时为 None"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+
+_current_scope: ContextVar[Optional[RequestScope]] = ContextVar("upstream_scope", default=None)
+_current_bulkhead: ContextVar[Optional[str]] = ContextVar("upstream_bulkhead", default=None)
+
+
+@contextmanager
+def request_scope(timeout: Optional[float] = None) -> Iterator[RequestScope]:
+    """
+    开启请求作用域，作用域内构建的所有服务共享同一份 memo
+
+    Args:
+        timeout: 请求的总时间预算（秒），作用域内的上游调用只使用剩余部分
+    """
+    scope = RequestScope()
+    if timeout is not None:
+        scope.deadline = time.monotonic() + timeout
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_scope() -> Optional[RequestScope]:
+    """当前请求作用域（不在请求中时为 None）"""
+    return _current_scope.get()
+
+
+@contextmanager
+def bulkhead(name: str) -> Iterator[None]:
+    """指定作用域内上游调用所属的舱壁（auth / read / evaluation）"""
+    token = _current_bulkhead.set(name)
+    try:
+        yield
+    finally:
+        _current_bulkhead.reset(token)
+
+
+async def memoize(key: Any, factory: Callable[[], Awaitable[T]]) -> T:
+    """
+    请求内记忆化
+
+    同一作用域内相同 key 只执行一次 factory，并发调用者等待同一结果；
+    执行失败不会被记住。没有作用域时直接执行。
+    """
+    scope = current_scope()
+    if scope is None:
+        return await factory()
+
+    future = scope.memo.get(key)
+    if future is None:
+        future = asyncio.ensure_future(factory())
+        scope.memo[key] = future
+        future.add_done_callback(
+            lambda f: scope.memo.pop(key, None) if f.cancelled() or f.exception() else None
+        )
+    else:
+        scope.memo_hits += 1
+    # shield：某个调用方被取消时不影响其他等待者
+    return await asyncio.shield(future)
+
+
+def _freeze(value: Any) -> Any:
+    """把请求参数转换为可哈希的 key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# ---------------------------------------------------------------------------
+# 跨请求合并
+# ---------------------------------------------------------------------------
+
+_request_flights = SingleFlight("requests")
+_result_flights = SingleFlight("results")
+_hedger: Optional[Hedger] = None
+
+
+def get_hedger() -> Hedger:
+    """获取全局对冲策略"""
+    global _hedger
+    if _hedger is None:
+        from ..config import get_settings
+        conf = get_settings().upstream_hedge
+        _hedger = Hedger(
+            enabled=bool(conf.get("enabled", True)),
+            percentile=float(conf.get("percentile", 0.95)),
+            min_delay=float(conf.get("min_delay", 1.0)),
+            budget_ratio=float(conf.get("budget_ratio", 0.05)),
+            min_samples=int(conf.get("min_samples", 20)),
+        )
+    return _hedger
+
+
+_retry_policy: Optional[RetryPolicy] = None
+
+
+def get_retry_policy() -> RetryPolicy:
+    """获取全局重试策略"""
+    global _retry_policy
+    if _retry_policy is None:
+        from ..config import get_settings
+        conf = get_settings().upstream_retry
+        _retry_policy = RetryPolicy(
+            enabled=bool(conf.get("enabled", True)),
+            max_attempts=int(conf.get("max_attempts", 3)),
+            base_delay=float(conf.get("base_delay", 0.2)),
+            max_delay=float(conf.get("max_delay", 2.0)),
+            per_request=int(conf.get("per_request", 2)),
+            max_tokens=float(conf.get("max_tokens", 10)),
+            token_ratio=float(conf.get("token_ratio", 0.1)),
+        )
+    return _retry_policy
+
+
+def _request_key(session: requests.Session, method: str, url: str, kwargs: Dict) -> tuple:
+    """上游调用的合并 key：(会话, 方法, URL, 参数, 请求体)"""
+    data = kwargs.get("data")
+    if isinstance(data, dict):
+        data = {k: v for k, v in data.items() if k not in CACHE_BUSTER_PARAMS}
+    return (
+        id(session), method, url,
+        _freeze(kwargs.get("params")),
+        _freeze(data),
+        kwargs.get("allow_redirects", True),
+    )
+
+
+async def _send(
+    session: requests.Session,
+    method: str,
+    url: str,
+    idempotent: bool,
+    hedge: bool = False,
+    **kwargs
+) -> requests.Response:
+    """发送请求，只读调用与在途的相同调用合并，并在瞬时故障时重试"""
+    engine = get_engine()
+
+    def once() -> Awaitable[requests.Response]:
+        return engine.request(session, method, url, **kwargs)
+
+    def attempt() -> Awaitable[requests.Response]:
+        if not idempotent:
+            return once()
+        scope = current_scope()
+        return get_retry_policy().run(
+            once, scope, lambda: scope.remaining() if scope else None
+        )
+
+    async def call() -> requests.Response:
+        if hedge and method == "GET":
+            return await get_hedger().run(engine.latency_window(url), attempt)
+        return await attempt()
+
+    if idempotent:
+        key = _request_key(session, method, url, kwargs)
+        return await _bounded(_request_flights.do(key, call))
+    return await call()
+
+
+async def _bounded(awaitable: Awaitable[T]) -> T:
+    """
+    按当前请求的剩余时间等待
+
+    合并的调用沿用发起者的截止时间，剩余时间更短的等待者到点后放弃等待，
+    在途调用不受影响。
+    """
+    scope = current_scope()
+    remaining = scope.remaining() if scope else None
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(remaining, 0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("请求已到截止时间，放弃等待上游结果")
+
+
+async def coalesce(key: Any, factory: Callable[[], Awaitable[T]]) -> T:
+    """
+    合并相同 key 的在途计算（如解析后的服务结果）
+
+    等待者共享同一个结果对象，调用方应视其为只读。
+    """
+    return await _bounded(_result_flights.do(key, factory))
+
+
+def get_flight_stats() -> Dict:
+    """single-flight 合并统计"""
+    return {
+        "requests": _request_flights.get_stats(),
+        "results": _result_flights.get_stats(),
+    }
+
+
+async def get(
+    session: requests.Session,
+    url: str,
+    memo: bool = False,
+    hedge: bool = False,
+    **kwargs
+) -> requests.Response:
+    """
+    异步 GET
+
+    Args:
+        memo: 为 True 时同一请求作用域内相同的 GET 只发送一次
+        hedge: 为 True 时允许对冲（仅用于幂等的页面读取）
+    """
+    if memo:
+        key = ("memo",) + _request_key(session, "GET", url, kwargs)
+        return await memoize(key, lambda: _send(session, "GET", url, True, hedge, **kwargs))
+    return await _send(session, "GET", url, True, hedge, **kwargs)
+
+
+async def post(session: requests.Session, url: str, idempotent: bool = False, **kwargs) -> requests.Response:
+    """
+    异步 POST
+
+    Args:
+        idempotent: 只读查询（如 dataQuery、成绩查询）标记为 True，允许合并
+    """
+    return await _send(session, "POST", url, idempotent, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# 会话内串行
+# ---------------------------------------------------------------------------
+
+_session_gates: "weakref.WeakKeyDictionary[requests.Session, Gate]" = weakref.WeakKeyDictionary()
+_session_gates_lock = threading.Lock()
+_held_sessions: ContextVar[tuple] = ContextVar("upstream_held_sessions", default=())
+_serial_stats = {"entered": 0, "waited": 0}
+
+
+@asynccontextmanager
+async def serialized(session: requests.Session) -> AsyncIterator[None]:
+    """
+    同一会话的状态相关调用按顺序执行
+
+    教务系统在服务端为每个会话保存导航状态（当前学期 semester.id、
+    课表页初始化等），同一会话并发切换学期会互相干扰。依赖这些状态的
+    调用序列放在此作用域内；无状态的读取不受影响，仍可并行。
+    可重入：已持有该会话的任务（及其子任务）直接进入。
+    """
+    held = _held_sessions.get()
+    if id(session) in held:
+        yield
+        return
+
+    with _session_gates_lock:
+        gate = _session_gates.get(session)
+        if gate is None:
+            gate = _session_gates[session] = Gate(1)
+        _serial_stats["entered"] += 1
+        if gate.active:
+            _serial_stats["waited"] += 1
+
+    scope = current_scope()
+    remaining = scope.remaining() if scope else None
+    if not await gate.acquire(None if remaining is None else max(remaining, 0)):
+        raise DeadlineExceeded("请求已到截止时间，会话上的前一个调用仍未完成")
+    token = _held_sessions.set(held + (id(session),))
+    try:
+        yield
+    finally:
+        _held_sessions.reset(token)
+        gate.release()
+
+
+def get_serial_stats() -> Dict:
+    """会话内串行统计：entered 为进入次数，waited 为需要排队的次数"""
+    with _session_gates_lock:
+        return {**_serial_stats, "sessions": len(_session_gates)}
+
+
+# ---------------------------------------------------------------------------
+# 同步兼容层
+# ---------------------------------------------------------------------------
+
+_shim_loop: Optional[asyncio.AbstractEventLoop] = None
+_shim_lock = threading.Lock()
+
+
+def _get_shim_loop() -> asyncio.AbstractEventLoop:
+    """后台事件循环，供同步调用方驱动异步服务"""
+    global _shim_loop
+    if _shim_loop is None:
+        with _shim_lock:
+            if _shim_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="upstream-sync-shim",
+                    daemon=True
+                )
+                thread.start()
+                _shim_loop = loop
+    return _shim_loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    同步执行协程
+
+    供 JwxtClient 等同步调用方使用。协程总是在后台循环中运行，
+    因此在已有事件循环的线程里调用也不会报错（但会阻塞该线程）。
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_shim_loop())
+    return future.result()
@@ -3,11 +3,24 @@
 """
 
 import re
-from typing import Dict, Optional
+import asyncio
+import logging
+from typing import Dict, List, Optional
 import requests
 from bs4 import BeautifulSoup
 
 from .constants import JWXT_BASE_URL
+from . import upstream
+from .errors import UpstreamError
+
+logger = logging.getLogger(__name__)
+
+# get_info 中单项的超时时间（秒）
+PART_TIMEOUT = 10.0
+
+# 学生详细信息字段
+DETAIL_FIELDS = ("name", "student_code", "department", "major", "class_name", "grade")
+WEEK_FIELDS = ("current_week", "semester_name")
 
 
 class UserService:
@@ -16,8 +29,12 @@ class UserService:
     def __init__(self, session: requests.Session):
         self.session = session
     
-    def get_student_id(self) -> Optional[str]:
-        """获取学生 ID"""
+    async def get_student_id(self) -> Optional[str]:
+        """获取学生 ID（同一请求内只解析一次）"""
+        return await upstream.memoize(("student_id", id(self.session)), self._scan_student_id)
+    
+    async def _scan_student_id(self) -> Optional[str]:
+        """从课表页面提取学生 ID"""
         patterns = [
             r'bg\.form\.addInput\s*\(\s*form\s*,\s*["\']ids["\']\s*,\s*["\'](\d+)["\']\s*\)',
             r'["\']?ids["\']?\s*[:=]\s*["\'](\d+)["\']',
@@ -32,29 +49,24 @@ class UserService:
         
         for url in urls:
             try:
-                resp = self.session.get(url, timeout=15)
+                resp = await upstream.get(self.session, url, memo=True, timeout=15)
                 for pattern in patterns:
                     match = re.search(pattern, resp.text, re.IGNORECASE)
                     if match:
                         return match.group(1)
+            except UpstreamError:
+                raise
             except Exception:
                 continue
         
         return None
     
-    def get_detail(self) -> Dict:
+    async def get_detail(self) -> Dict:
         """获取学生详细信息"""
-        result = {
-            "name": None,
-            "student_code": None,
-            "department": None,
-            "major": None,
-            "class_name": None,
-            "grade": None,
-        }
+        result = dict.fromkeys(DETAIL_FIELDS)
         
         try:
-            resp = self.session.get(f"{JWXT_BASE_URL}/eams/stdDetail.action", timeout=15)
+            resp = await upstream.get(self.session, f"{JWXT_BASE_URL}/eams/stdDetail.action", memo=True, hedge=True, timeout=15)
             soup = BeautifulSoup(resp.text, "html.parser")
             
             field_map = {
@@ -75,17 +87,19 @@ class UserService:
                             key = field_map[text]
                             if not result[key]:
                                 result[key] = cells[i + 1].get_text(strip=True)
+        except UpstreamError:
+            raise
         except Exception:
             pass
         
         return result
     
-    def get_current_week(self) -> Dict:
+    async def get_current_week(self) -> Dict:
         """获取当前周次和学期"""
-        result = {"current_week": None, "semester_name": None}
+        result = dict.fromkeys(WEEK_FIELDS)
         
         try:
-            resp = self.session.get(f"{JWXT_BASE_URL}/eams/home!welcome.action", timeout=15)
+            resp = await upstream.get(self.session, f"{JWXT_BASE_URL}/eams/home!welcome.action", memo=True, hedge=True, timeout=15)
             text = resp.text
             
             # 提取周次
@@ -97,23 +111,50 @@ class UserService:
             sem_match = re.search(r'(\d{4}[-~–]\d{4})学年.*?第\s*(\d+)\s*学期', text)
             if sem_match:
                 result["semester_name"] = f"{sem_match.group(1)}学年第{sem_match.group(2)}学期"
+        except UpstreamError:
+            raise
         except Exception:
             pass
         
         return result
     
-    def get_info(self) -> Dict:
-        """获取完整用户信息"""
+    async def _with_timeout(self, name: str, coro, default, timeout: float, missing: List[str], errors: List[UpstreamError]):
+        """单项超时或上游失败（熔断、繁忙、超过截止时间）后返回默认值，不拖慢其他项"""
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"[user] {name} timed out after {timeout}s")
+        except UpstreamError as e:
+            logger.warning(f"[user] {name} failed: {e}")
+            errors.append(e)
+        missing.append(name)
+        return default
+    
+    async def get_info(self, part_timeout: float = PART_TIMEOUT) -> Dict:
+        """
+        获取完整用户信息
+        
+        学生 ID、详细信息、当前周次并发获取；某一项超时或上游失败时返回部分数据，
+        缺失项记录在 partial 字段中。三项都因上游失败缺失时抛出该上游错误
+        """
+        missing: List[str] = []
+        errors: List[UpstreamError] = []
+        student_id, detail, week_info = await asyncio.gather(
+            self._with_timeout("student_id", self.get_student_id(), None, part_timeout, missing, errors),
+            self._with_timeout("detail", self.get_detail(), dict.fromkeys(DETAIL_FIELDS), part_timeout, missing, errors),
+            self._with_timeout("current_week", self.get_current_week(), dict.fromkeys(WEEK_FIELDS), part_timeout, missing, errors),
+        )
+        if len(errors) == 3:
+            raise errors[0]
+        
         info = {
             "success": True,
-            "student_id": self.get_student_id(),
+            "student_id": student_id,
         }
-        
-        detail = self.get_detail()
         info.update(detail)
-        
-        week_info = self.get_current_week()
         info.update(week_info)
+        if missing:
+            info["partial"] = missing
         
         # 从 cookie 获取学期 ID
         for cookie in self.session.cookies:
@@ -7,12 +7,17 @@ FastAPI 应用主入口
 """
 
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from typing import AsyncIterator
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 
 from .config import get_settings
+from .core import upstream
+from .core.errors import UpstreamError, UpstreamUnavailable
+from .services.admission import AdmissionMiddleware, get_admission_controller
 from .routers import (
     auth_router,
     course_router,
@@ -21,7 +26,10 @@ from .routers import (
     user_router,
     cache_router,
     exam_router,
-    evaluation_router
+    evaluation_router,
+    metrics_router,
+    dashboard_router,
+    batch_router
 )
 
 # 配置日志
@@ -30,14 +38,72 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """应用生命周期：关闭时释放上游连接池"""
+    yield
+    upstream.close_adapter()
+    logger.info("[shutdown] Upstream connection pool closed")
+
+
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="西外教务系统 API 服务",
+    lifespan=lifespan,
 )
 
+@app.middleware("http")
+async def upstream_scope(request: Request, call_next):
+    """
+    每个 API 请求一个上游作用域，请求内的服务共享页面 memo 和截止时间，
+    上游调用使用与路由类别同名的舱壁
+    """
+    route_class = get_admission_controller().classify(request.url.path)
+    with upstream.request_scope(timeout=request_deadline(request)), \
+            upstream.bulkhead(route_class.name if route_class else upstream.DEFAULT_BULKHEAD):
+        return await call_next(request)
+
+
+# 入口准入控制（最后添加，位于最外层）
+app.add_middleware(AdmissionMiddleware)
+
+
+def request_deadline(request: Request) -> float:
+    """请求的总时间预算（秒）：取路由配置与调用方 X-Deadline-Ms 中较小者"""
+    path = request.url.path
+    budget = settings.default_deadline
+    matched = ""
+    for prefix, seconds in settings.route_deadlines.items():
+        if path.startswith(prefix) and len(prefix) > len(matched):
+            matched, budget = prefix, seconds
+
+    header = request.headers.get("x-deadline-ms")
+    if header:
+        try:
+            budget = min(budget, max(float(header), 0) / 1000)
+        except ValueError:
+            logger.warning(f"[deadline] Invalid X-Deadline-Ms: {header}")
+    return budget
+
+
+@app.exception_handler(UpstreamError)
+async def upstream_error_handler(request: Request, exc: UpstreamError):
+    """上游熔断 / 繁忙 / 超过截止时间：快速返回 503/504 和区分原因的错误码"""
+    headers = {}
+    if isinstance(exc, UpstreamUnavailable):
+        headers["Retry-After"] = str(upstream.get_engine().retry_after() or 1)
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"success": False, "error": str(exc), "code": exc.code},
+        headers=headers,
+    )
+
+
 # 注册路由
 app.include_router(auth_router)
 app.include_router(course_router)
@@ -47,6 +113,9 @@ app.include_router(user_router)
 app.include_router(cache_router)
 app.include_router(exam_router)
 app.include_router(evaluation_router)
+app.include_router(metrics_router)
+app.include_router(dashboard_router)
+app.include_router(batch_router)
 
 # 静态文件
 static_dir = Path(__file__).parent / "static"
@@ -69,8 +138,13 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """健康检查"""
-    return {"status": "ok"}
+    """健康检查（含上游熔断状态）"""
+    breakers = upstream.get_engine().get_breaker_stats()
+    degraded = any(b["state"] != "closed" for b in breakers.values())
+    return {
+        "status": "degraded" if degraded else "ok",
+        "upstream": {group: b["state"] for group, b in breakers.items()},
+    }
 
 
 if __name__ == "__main__":
@@ -10,6 +10,9 @@ from .user import router as user_router
 from .cache import router as cache_router
 from .exam import router as exam_router
 from .evaluation import router as evaluation_router
+from .metrics import router as metrics_router
+from .dashboard import router as dashboard_router
+from .batch import router as batch_router
 
 __all__ = [
     "auth_router",
@@ -19,6 +22,9 @@ __all__ = [
     "user_router",
     "cache_router",
     "exam_router",
-    "evaluation_router"
+    "evaluation_router",
+    "metrics_router",
+    "dashboard_router",
+    "batch_router"
 ]
 
@@ -14,7 +14,8 @@ from pydantic import BaseModel
 
 from ..services.auth_service import AuthService
 from ..services.token_service import get_token_service, TokenService
-from ..core import JwxtClient
+from ..services.login_coordinator import get_login_coordinator
+from ..core import AuthError, UpstreamError
 
 router = APIRouter(prefix="/auth", tags=["认证"])
 logger = logging.getLogger(__name__)
@@ -85,19 +86,13 @@ async def login(request: LoginRequest):
     """
     t0 = time.time()
     try:
-        # 使用 JwxtClient 登录并获取用户信息
-        client = JwxtClient()
-        login_result = client.login(request.username, request.password)
-        
-        if not login_result.get("success"):
+        # 登录并获取用户信息（同一账号的并发登录合并为一次）
+        try:
+            session, user_info = await get_login_coordinator().login(request.username, request.password)
+        except AuthError as e:
             logger.warning(f"[/auth/login] Login failed for {request.username}")
-            return make_response(
-                False,
-                error=login_result.get("error", "登录失败")
-            )
+            return make_response(False, error=str(e) or "登录失败")
         
-        # 获取用户信息
-        user_info = client.get_user_info()
         if not user_info.get("success"):
             user_info = {"student_id": request.username}
         
@@ -105,7 +100,7 @@ async def login(request: LoginRequest):
         token_service = get_token_service()
         token, expires_in = token_service.create_token(
             username=request.username,
-            session=client.session,
+            session=session,
             user_info=user_info,
         )
         
@@ -120,6 +115,8 @@ async def login(request: LoginRequest):
             }
         )
         
+    except UpstreamError:
+        raise
     except Exception as e:
         logger.error(f"[/auth/login] Error: {str(e)}")
         return make_response(False, error=str(e))
@@ -143,22 +140,20 @@ async def refresh_session(
             raise HTTPException(status_code=401, detail="未提供认证令牌")
         
         # 重新登录
-        client = JwxtClient()
-        login_result = client.login(request.username, request.password)
-        
-        if not login_result.get("success"):
-            return make_response(False, error=login_result.get("error", "登录失败"))
+        try:
+            session, user_info = await get_login_coordinator().login(request.username, request.password)
+        except AuthError as e:
+            return make_response(False, error=str(e) or "登录失败")
         
         # 更新 token 对应的会话
         token_service = get_token_service()
-        success = token_service.refresh_token(token, client.session)
+        success = token_service.refresh_token(token, session)
         
         if not success:
             # token 不存在，创建新的
-            user_info = client.get_user_info()
             new_token, expires_in = token_service.create_token(
                 username=request.username,
-                session=client.session,
+                session=session,
                 user_info=user_info if user_info.get("success") else {},
             )
             logger.info(f"[/auth/refresh] Created new token for {request.username}")
@@ -167,7 +162,7 @@ async def refresh_session(
         logger.info(f"[/auth/refresh] Success for {request.username} in {time.time()-t0:.2f}s")
         return make_response(True, data={"message": "会话已刷新"})
         
-    except HTTPException:
+    except (HTTPException, UpstreamError):
         raise
     except Exception as e:
         logger.error(f"[/auth/refresh] Error: {str(e)}")
@@ -0,0 +1,68 @@
+"""
+批量请求路由 - Token 认证模式
+"""
+
+import time
+import logging
+from typing import Any, Dict, List, Tuple
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import requests
+
+from ..services.dependencies import require_auth
+from ..services.data_service import DataService
+
+router = APIRouter(tags=["批量"])
+logger = logging.getLogger(__name__)
+
+# 单次批量请求的最大操作数
+MAX_OPERATIONS = 20
+
+
+class BatchOperation(BaseModel):
+    op: str
+    params: Dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    refresh: bool = False  # 跳过缓存，重新获取
+
+
+def make_response(success: bool, data=None, error=None):
+    payload = {"success": success}
+    if error:
+        payload["error"] = error
+    if data is not None:
+        payload["data"] = data
+    return JSONResponse(content=payload)
+
+
+@router.post("/batch")
+async def run_batch(
+    request: BatchRequest,
+    auth: Tuple[requests.Session, dict, str] = Depends(require_auth)
+):
+    """
+    批量执行多个查询操作
+    
+    支持的操作：user、semester、course、grade、exam、evaluation，
+    course / grade / exam 可带 params.semester_id。
+    一次认证，各操作并发执行，data 按请求顺序返回每个操作的结果。
+    
+    需要 Authorization: Bearer <token> 认证
+    """
+    session, user_info, token = auth
+    t0 = time.time()
+    
+    if not request.operations:
+        return make_response(False, error="操作列表为空")
+    if len(request.operations) > MAX_OPERATIONS:
+        return make_response(False, error=f"单次最多 {MAX_OPERATIONS} 个操作")
+    
+    operations = [{"op": item.op, "params": item.params} for item in request.operations]
+    results = await DataService.from_auth(auth, request.refresh).run_batch(operations)
+    
+    logger.info(f"[/batch] {len(results)} operations done in {time.time()-t0:.2f}s")
+    return make_response(True, data=results)
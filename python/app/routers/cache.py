@@ -5,6 +5,7 @@
 from fastapi import APIRouter
 
 from ..services.session_cache import get_session_cache
+from ..services.result_cache import get_result_cache
 
 router = APIRouter(prefix="/cache", tags=["缓存管理"])
 
@@ -12,7 +13,9 @@ router = APIRouter(prefix="/cache", tags=["缓存管理"])
 @router.get("/stats")
 async def cache_stats():
     """获取缓存统计信息"""
-    return get_session_cache().get_stats()
+    stats = get_session_cache().get_stats()
+    stats["results"] = get_result_cache().get_stats()
+    return stats
 
 
 @router.get("/info")
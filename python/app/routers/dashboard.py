@@ -0,0 +1,53 @@
+"""
+首页聚合路由 - Token 认证模式
+"""
+
+import time
+import logging
+from typing import Tuple
+from fastapi import APIRouter, Query, Depends, Request
+from fastapi.responses import JSONResponse
+import requests
+
+from ..services.dependencies import require_auth
+from ..services.data_service import DataService
+from ..services.etag import etag_response
+
+router = APIRouter(tags=["首页"])
+logger = logging.getLogger(__name__)
+
+
+def make_response(success: bool, data=None, error=None):
+    payload = {"success": success}
+    if error:
+        payload["error"] = error
+    if data is not None:
+        payload["data"] = data
+    return JSONResponse(content=payload)
+
+
+@router.get("/dashboard")
+async def get_dashboard(
+    request: Request,
+    refresh: bool = Query(False, description="跳过缓存，重新获取"),
+    auth: Tuple[requests.Session, dict, str] = Depends(require_auth)
+):
+    """
+    获取首页数据（用户信息、学期、课程表、考试、待评教数）
+    
+    学期和学号只解析一次，各部分并发获取，data 中每个部分单独带 success / error。
+    
+    需要 Authorization: Bearer <token> 认证
+    """
+    session, user_info, token = auth
+    t0 = time.time()
+    
+    sections = await DataService.from_auth(auth, refresh).get_dashboard()
+    failed = [name for name, section in sections.items() if not section.get("success")]
+    if failed:
+        logger.warning(f"[/dashboard] Failed sections: {failed}")
+    
+    logger.info(f"[/dashboard] Done in {time.time()-t0:.2f}s")
+    if len(failed) == len(sections):
+        return make_response(False, error="获取首页数据失败", data=sections)
+    return etag_response(request, sections)
@@ -2,20 +2,28 @@
 评教路由 - Token 认证模式
 """
 
+import json
 import time
+import asyncio
 import logging
-from typing import Optional, Tuple
-from fastapi import APIRouter, Query, Depends, Body
-from fastapi.responses import JSONResponse
+from typing import AsyncIterator, Tuple
+from fastapi import APIRouter, Query, Depends, Body, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import requests
 
 from ..services.dependencies import require_auth
+from ..services.etag import etag_response
+from ..services.data_service import DataService
+from ..core.errors import UpstreamError
 from ..core.evaluation import EvaluationService
 
 router = APIRouter(tags=["评教"])
 logger = logging.getLogger(__name__)
 
+# 事件流无数据时发送保活注释的间隔（秒）
+KEEPALIVE_INTERVAL = 15
+
 
 class EvaluationSubmitRequest(BaseModel):
     lesson_id: str
@@ -34,6 +42,8 @@ def make_response(success: bool, data=None, error=None):
 
 @router.get("/evaluation/pending")
 async def get_pending_evaluations(
+    request: Request,
+    refresh: bool = Query(False, description="跳过缓存，重新获取"),
     auth: Tuple[requests.Session, dict, str] = Depends(require_auth)
 ):
     """
@@ -45,15 +55,16 @@ async def get_pending_evaluations(
     t0 = time.time()
     
     try:
-        eval_service = EvaluationService(session)
-        result = eval_service.get_pending_evaluations()
+        result = await DataService.from_auth(auth, refresh).get_pending_evaluations()
         
         logger.info(f"[/evaluation/pending] Done in {time.time()-t0:.2f}s")
         
         if result.get("success"):
-            return make_response(True, data=result)
+            return etag_response(request, result)
         else:
             return make_response(False, error=result.get("error"))
+    except UpstreamError:
+        raise
     except Exception as e:
         logger.error(f"[/evaluation/pending] Error: {e}")
         return make_response(False, error=str(e))
@@ -75,7 +86,10 @@ async def submit_evaluation(
     
     try:
         eval_service = EvaluationService(session)
-        result = eval_service.evaluate_single(evaluation_id, request.choice, request.comment)
+        try:
+            result = await eval_service.evaluate_single(evaluation_id, request.choice, request.comment)
+        finally:
+            await DataService.from_auth(auth).invalidate_evaluations()
         
         logger.info(f"[/evaluation/submit] Done in {time.time()-t0:.2f}s")
         
@@ -83,6 +97,8 @@ async def submit_evaluation(
             return make_response(True, data=result)
         else:
             return make_response(False, error=result.get("error"))
+    except UpstreamError:
+        raise
     except Exception as e:
         logger.error(f"[/evaluation/submit] Error: {e}")
         return make_response(False, error=str(e))
@@ -104,7 +120,10 @@ async def auto_evaluate_all(
     
     try:
         eval_service = EvaluationService(session)
-        result = eval_service.evaluate_all(choice, comment)
+        try:
+            result = await eval_service.evaluate_all(choice, comment)
+        finally:
+            await DataService.from_auth(auth).invalidate_evaluations()
         
         logger.info(f"[/evaluation/auto] Done in {time.time()-t0:.2f}s, {result.get('succeeded', 0)}/{result.get('total', 0)} succeeded")
         
@@ -112,6 +131,83 @@ async def auto_evaluate_all(
             return make_response(True, data=result)
         else:
             return make_response(False, error=result.get("error"))
+    except UpstreamError:
+        raise
     except Exception as e:
         logger.error(f"[/evaluation/auto] Error: {e}")
         return make_response(False, error=str(e))
+
+
+def sse_event(event: str, data: dict) -> str:
+    """格式化一条 SSE 事件"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/evaluation/auto/stream")
+async def auto_evaluate_stream(
+    choice: int = Query(0, ge=0, le=4, description="评价选项"),
+    comment: str = Query("无", description="意见建议"),
+    auth: Tuple[requests.Session, dict, str] = Depends(require_auth)
+):
+    """
+    自动评教所有待评课程（SSE 进度流）
+    
+    事件依次为：start（课程总数）、每门课程完成时一个 lesson、最后一个 done（汇总，同 /evaluation/auto）；
+    获取待评教列表失败时只发送一个 error。无事件期间定期发送保活注释。
+    
+    需要 Authorization: Bearer <token> 认证
+    """
+    session, user_info, token = auth
+    eval_service = EvaluationService(session)
+    
+    async def events() -> AsyncIterator[str]:
+        t0 = time.time()
+        try:
+            pending = await eval_service.get_pending_evaluations()
+        except UpstreamError as e:
+            yield sse_event("error", {"error": str(e), "code": e.code})
+            return
+        if not pending.get("success"):
+            yield sse_event("error", {"error": pending.get("error")})
+            return
+        
+        evaluations = pending.get("evaluations", [])
+        yield sse_event("start", {"total": len(evaluations)})
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce():
+            try:
+                async for item in eval_service.iter_evaluate(evaluations, choice, comment):
+                    await queue.put(item)
+            finally:
+                await queue.put(None)
+        
+        details = [None] * len(evaluations)
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                index, detail = item
+                details[index] = detail
+                yield sse_event("lesson", {"index": index, **detail})
+        finally:
+            # 客户端断开时停止剩余课程的评教
+            producer.cancel()
+            await DataService.from_auth(auth).invalidate_evaluations()
+        
+        summary = EvaluationService.summarize(details)
+        logger.info(f"[/evaluation/auto/stream] Done in {time.time()-t0:.2f}s, {summary['succeeded']}/{summary['total']} succeeded")
+        yield sse_event("done", summary)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -5,12 +5,14 @@
 import time
 import logging
 from typing import Optional, Tuple
-from fastapi import APIRouter, Query, Depends
+from fastapi import APIRouter, Query, Depends, Request
 from fastapi.responses import JSONResponse
 import requests
 
 from ..services.dependencies import require_auth
-from ..core.exam import ExamService
+from ..services.etag import etag_response
+from ..services.data_service import DataService
+from ..core.errors import UpstreamError
 
 router = APIRouter(tags=["考试"])
 logger = logging.getLogger(__name__)
@@ -27,7 +29,9 @@ def make_response(success: bool, data=None, error=None):
 
 @router.get("/exam")
 async def get_exams(
+    request: Request,
     semester_id: Optional[str] = Query(None, description="学期ID"),
+    refresh: bool = Query(False, description="跳过缓存，重新获取"),
     auth: Tuple[requests.Session, dict, str] = Depends(require_auth)
 ):
     """
@@ -39,15 +43,16 @@ async def get_exams(
     t0 = time.time()
     
     try:
-        exam_service = ExamService(session)
-        exams = exam_service.get_exams(semester_id)
+        exams = await DataService.from_auth(auth, refresh).get_exams(semester_id)
         
         if not exams.get("success"):
             return make_response(False, error=exams.get("error"), data=exams)
         
         logger.info(f"[/exam] Done in {time.time()-t0:.2f}s, found {exams.get('total', 0)} exams")
-        return make_response(True, data=exams)
+        return etag_response(request, exams)
         
+    except UpstreamError:
+        raise
     except Exception as e:
         logger.error(f"[/exam] Error: {e}")
         return make_response(False, error=str(e))
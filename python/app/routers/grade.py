@@ -5,12 +5,14 @@
 import time
 import logging
 from typing import Optional, Tuple
-from fastapi import APIRouter, Query, Depends
+from fastapi import APIRouter, Query, Depends, Request
 from fastapi.responses import JSONResponse
 import requests
 
 from ..services.dependencies import require_auth
-from ..core.grade import GradeService
+from ..services.etag import etag_response
+from ..services.data_service import DataService
+from ..core.errors import UpstreamError
 
 router = APIRouter(tags=["成绩"])
 logger = logging.getLogger(__name__)
@@ -27,7 +29,9 @@ def make_response(success: bool, data=None, error=None):
 
 @router.get("/grade")
 async def get_grades(
+    request: Request,
     semester_id: Optional[str] = Query(None, description="学期ID，不传则获取全部"),
+    refresh: bool = Query(False, description="跳过缓存，重新获取"),
     auth: Tuple[requests.Session, dict, str] = Depends(require_auth)
 ):
     """
@@ -39,15 +43,16 @@ async def get_grades(
     t0 = time.time()
     
     try:
-        grade_service = GradeService(session)
-        grades = grade_service.get_grades(semester_id)
+        grades = await DataService.from_auth(auth, refresh).get_grades(semester_id)
         
         if not grades.get("success"):
             return make_response(False, error=grades.get("error"), data=grades)
         
         logger.info(f"[/grade] Done in {time.time()-t0:.2f}s")
-        return make_response(True, data=grades)
+        return etag_response(request, grades)
         
+    except UpstreamError:
+        raise
     except Exception as e:
         logger.error(f"[/grade] Error: {e}")
         return make_response(False, error=str(e))
@@ -0,0 +1,43 @@
+"""
+运行指标路由
+"""
+
+from fastapi import APIRouter
+
+from ..core import upstream
+from ..core.parse_memo import get_parse_memo
+from ..core.semester import SemesterService
+from ..services.admission import get_admission_controller
+from ..services.login_coordinator import get_login_coordinator
+from ..services.profile_store import get_profile_store
+from ..services.semester_catalog import get_semester_catalog
+
+router = APIRouter(prefix="/metrics", tags=["监控"])
+
+
+@router.get("/upstream")
+async def upstream_metrics():
+    """上游请求引擎与连接池统计"""
+    return {
+        "engine": upstream.get_engine().get_stats(),
+        "bulkheads": upstream.get_engine().get_bulkhead_stats(),
+        "limits": upstream.get_engine().get_limiter_stats(),
+        "breakers": upstream.get_engine().get_breaker_stats(),
+        "latency": upstream.get_engine().get_latency_stats(),
+        "hedging": upstream.get_hedger().get_stats(),
+        "retries": upstream.get_retry_policy().get_stats(),
+        "pool": upstream.get_adapter().get_stats(),
+        "single_flight": upstream.get_flight_stats(),
+        "session_serial": upstream.get_serial_stats(),
+        "parse_memo": get_parse_memo().get_stats(),
+        "semester_probes": SemesterService.get_probe_stats(),
+        "semester_catalog": get_semester_catalog().get_stats(),
+        "logins": get_login_coordinator().get_stats(),
+        "profiles": get_profile_store().get_stats(),
+    }
+
+
+@router.get("/admission")
+async def admission_metrics():
+    """入口准入控制统计"""
+    return get_admission_controller().get_stats()
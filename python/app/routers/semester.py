@@ -5,12 +5,14 @@
 import time
 import logging
 from typing import Tuple
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Query, Depends, Request
 from fastapi.responses import JSONResponse
 import requests
 
 from ..services.dependencies import require_auth
-from ..core.semester import SemesterService
+from ..services.data_service import DataService
+from ..services.etag import etag_response
+from ..core.errors import UpstreamError
 
 router = APIRouter(tags=["学期"])
 logger = logging.getLogger(__name__)
@@ -27,6 +29,8 @@ def make_response(success: bool, data=None, error=None):
 
 @router.get("/semester")
 async def get_semester_info(
+    request: Request,
+    refresh: bool = Query(False, description="跳过缓存，重新获取"),
     auth: Tuple[requests.Session, dict, str] = Depends(require_auth)
 ):
     """
@@ -38,18 +42,17 @@ async def get_semester_info(
     t0 = time.time()
     
     try:
-        semester_service = SemesterService(session)
-        semester_info = semester_service.get_info()
+        # 优先使用全局学期目录
+        semester_info = await DataService.from_auth(auth, refresh).get_semester()
         
         if not semester_info.get("success"):
-            avail = semester_service.get_available()
-            if avail.get("success"):
-                return make_response(True, data=avail)
             return make_response(False, error=semester_info.get("error"), data=semester_info)
         
         logger.info(f"[/semester] Done in {time.time()-t0:.2f}s")
-        return make_response(True, data=semester_info)
+        return etag_response(request, semester_info)
         
+    except UpstreamError:
+        raise
     except Exception as e:
         logger.error(f"[/semester] Error: {e}")
         return make_response(False, error=str(e))
@@ -5,12 +5,14 @@
 import time
 import logging
 from typing import Tuple
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
 import requests
 
+from ..services.data_service import DataService
 from ..services.dependencies import require_auth
-from ..core.user import UserService
+from ..services.etag import etag_response
+from ..core.errors import UpstreamError
 
 router = APIRouter(tags=["用户"])
 logger = logging.getLogger(__name__)
@@ -26,28 +28,26 @@ def make_response(success: bool, data=None, error=None):
 
 
 @router.get("/user")
-async def get_user_info(auth: Tuple[requests.Session, dict, str] = Depends(require_auth)):
+async def get_user_info(
+    request: Request,
+    auth: Tuple[requests.Session, dict, str] = Depends(require_auth)
+):
     """
     获取用户信息
     
     需要 Authorization: Bearer <token> 认证
     """
-    session, user_info, token = auth
     t0 = time.time()
     
     try:
-        # 如果缓存的 user_info 已包含完整信息，直接返回
-        if user_info.get("name") and user_info.get("student_id"):
-            logger.info(f"[/user] Returned cached info in {time.time()-t0:.4f}s")
-            return make_response(True, data=user_info)
-        
-        # 否则重新获取
-        user_service = UserService(session)
-        fresh_info = user_service.get_info()
+        # 缓存的 user_info 已包含完整信息时直接返回，否则重新获取
+        profile = await DataService.from_auth(auth).get_profile()
         
         logger.info(f"[/user] Done in {time.time()-t0:.2f}s")
-        return make_response(True, data=fresh_info)
+        return etag_response(request, profile)
         
+    except UpstreamError:
+        raise
     except Exception as e:
         logger.error(f"[/user] Error: {e}")
         return make_response(False, error=str(e))
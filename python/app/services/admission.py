@@ -0,0 +1,277 @@
+"""
+入口准入控制
+
+按路由类别（登录 / 只读查询 / 评教）统计在途请求数和近期耗时，
+估算新请求的等待时间。超过阈值时直接返回 503 + Retry-After，
+不让请求在 uvicorn 里无限排队；被拒绝的 GET 如果有最近一次成功的结果，
+则返回该结果（标记为过期数据）而不是报错。
+
+AdmissionMiddleware 是纯 ASGI 中间件：在途计数在下游应用返回（包括流式响应发送完毕、
+客户端提前断开、抛出异常）后一定归还；成功的 GET 响应在转发的同时复制一份供过期回放。
+"""
+
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class RouteClass:
+    """单个路由类别的在途计数与耗时估计"""
+
+    def __init__(self, name: str, max_in_flight: int = 100, max_wait: float = 10, alpha: float = 0.2):
+        self.name = name
+        self._max_in_flight = max(max_in_flight, 1)
+        self._max_wait = max_wait
+        self._alpha = alpha
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency = 0.0  # 最近完成请求耗时的 EWMA（秒）
+        self._admitted = 0
+        self._rejected = 0
+        self._served_stale = 0
+
+    def estimated_wait(self) -> float:
+        """
+        新请求的预计等待时间
+
+        在途请求按近期耗时排在前面：预计等待 = 近期耗时 × 在途数 / 容量。
+        上游变慢时可接纳的并发随之收缩。
+        """
+        return self._latency * self._in_flight / self._max_in_flight
+
+    def try_admit(self) -> Optional[float]:
+        """尝试准入，成功返回 None，拒绝时返回建议的 Retry-After（秒）"""
+        with self._lock:
+            wait = self.estimated_wait()
+            if self._in_flight >= self._max_in_flight or wait > self._max_wait:
+                self._rejected += 1
+                return min(max(math.ceil(max(wait, self._latency)), 1), 30)
+            self._in_flight += 1
+            self._admitted += 1
+            return None
+
+    def done(self, seconds: float) -> None:
+        """请求完成，更新耗时估计"""
+        with self._lock:
+            self._in_flight -= 1
+            if self._latency == 0:
+                self._latency = seconds
+            else:
+                self._latency += self._alpha * (seconds - self._latency)
+
+    def mark_stale(self) -> None:
+        with self._lock:
+            self._served_stale += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_in_flight": self._max_in_flight,
+                "max_wait": self._max_wait,
+                "in_flight": self._in_flight,
+                "latency_ewma_ms": round(self._latency * 1000, 1),
+                "estimated_wait_ms": round(self.estimated_wait() * 1000, 1),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "served_stale": self._served_stale,
+            }
+
+
+class StaleCache:
+    """最近一次成功 GET 响应的 LRU，仅在拒绝请求时使用"""
+
+    def __init__(self, max_entries: int = 1000, ttl: int = 600, max_body: int = 256 * 1024):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self.max_body = max_body
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, bytes, Optional[str]]]" = OrderedDict()
+
+    @staticmethod
+    def key(authorization: Optional[str], path: str, query: str) -> Tuple:
+        """缓存 key：(令牌摘要, 路径, 查询参数)，不同用户的数据互不可见"""
+        owner = hashlib.sha256(authorization.encode()).hexdigest()[:32] if authorization else ""
+        return owner, path, query
+
+    def put(self, key: Tuple, body: bytes, etag: Optional[str] = None) -> None:
+        """只保存 success 为 true 的 JSON 响应"""
+        if len(body) > self.max_body:
+            return
+        try:
+            if not json.loads(body).get("success"):
+                return
+        except (ValueError, AttributeError):
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, float, Optional[str]]]:
+        """返回 (响应体, 数据年龄秒数, ETag)，过期或不存在时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = time.time() - entry[0]
+            if age > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], age, entry[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AdmissionController:
+    """按路由类别的准入控制器"""
+
+    def __init__(self, limits: Dict[str, Dict[str, float]], routes: Dict[str, str], stale_ttl: int = 600):
+        self._routes = routes
+        self._classes: Dict[str, RouteClass] = {
+            name: RouteClass(
+                name,
+                max_in_flight=int(conf.get("max_in_flight", 100)),
+                max_wait=float(conf.get("max_wait", 10)),
+            )
+            for name, conf in limits.items()
+        }
+        self.stale = StaleCache(ttl=stale_ttl)
+
+    def classify(self, path: str) -> Optional[RouteClass]:
+        """按最长路径前缀匹配路由类别，不受控的路径（健康检查、监控、静态文件等）返回 None"""
+        matched = ""
+        for prefix in self._routes:
+            if path.startswith(prefix) and len(prefix) > len(matched):
+                matched = prefix
+        if not matched:
+            return None
+        return self._classes.get(self._routes[matched])
+
+    def get_stats(self) -> Dict:
+        stats = {name: cls.get_stats() for name, cls in self._classes.items()}
+        stats["stale_entries"] = len(self.stale)
+        return stats
+
+
+class AdmissionMiddleware:
+    """
+    入口准入控制中间件（最外层）
+
+    预计等待超过阈值时快速返回 503 + Retry-After；
+    被拒绝的 GET 有最近一次成功结果时返回该结果，并标记为过期数据。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        controller = get_admission_controller()
+        route_class = controller.classify(scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        is_get = scope["method"] == "GET"
+        cache_key = controller.stale.key(
+            Headers(scope=scope).get("authorization"),
+            scope["path"],
+            scope.get("query_string", b"").decode("latin-1"),
+        )
+
+        retry_after = route_class.try_admit()
+        if retry_after is not None:
+            response = self._reject(scope, controller, route_class, cache_key if is_get else None, retry_after)
+            await response(scope, receive, send)
+            return
+
+        # 成功的 JSON GET 响应边转发边复制，超过 max_body 时放弃复制
+        record = {"enabled": False, "etag": None, "complete": False}
+        chunks: List[bytes] = []
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal size
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                record["enabled"] = is_get and message["status"] == 200 and \
+                    headers.get("content-type", "").startswith("application/json")
+                record["etag"] = headers.get("etag")
+            elif message["type"] == "http.response.body" and record["enabled"]:
+                body = message.get("body", b"")
+                size += len(body)
+                if size > controller.stale.max_body:
+                    record["enabled"] = False
+                    chunks.clear()
+                else:
+                    chunks.append(body)
+                    record["complete"] = not message.get("more_body", False)
+            await send(message)
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route_class.done(time.monotonic() - started)
+
+        if record["enabled"] and record["complete"]:
+            controller.stale.put(cache_key, b"".join(chunks), record["etag"])
+
+    @staticmethod
+    def _reject(
+        scope: Scope,
+        controller: "AdmissionController",
+        route_class: RouteClass,
+        cache_key: Optional[Tuple],
+        retry_after: float,
+    ) -> Response:
+        """拒绝请求：有过期结果时回放（保留原 ETag），否则返回 503"""
+        cached = controller.stale.get(cache_key) if cache_key else None
+        if cached:
+            body, age, etag = cached
+            route_class.mark_stale()
+            headers = {"X-Cache": "STALE", "Age": str(int(age))}
+            if etag:
+                headers["ETag"] = etag
+            return Response(content=body, media_type="application/json", headers=headers)
+        logger.warning(f"[admission] Shed {scope['method']} {scope['path']} ({route_class.name})")
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "error": "服务繁忙，请稍后重试", "code": "OVERLOADED"},
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+# 全局实例
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """获取全局准入控制器"""
+    global _controller
+    if _controller is None:
+        from ..config import get_settings
+        settings = get_settings()
+        _controller = AdmissionController(
+            limits=settings.admission_limits,
+            routes=settings.admission_routes,
+            stale_ttl=settings.admission_stale_ttl,
+        )
+    return _controller
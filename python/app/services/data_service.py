@@ -0,0 +1,221 @@
+"""
+聚合数据服务
+
+多个接口共用的学期 / 学号解析（同一请求内只解析一次），
+经过解析结果缓存的数据查询，首页聚合查询，以及批量接口的单个操作分发。
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from ..core import CourseService, ExamService, GradeService, SemesterService, UserService, upstream
+from ..core.evaluation import EvaluationService
+from ..core.errors import UpstreamError
+from .profile_store import get_profile_store
+from .result_cache import get_result_cache
+from .semester_catalog import get_semester_catalog
+from .token_service import get_token_service
+
+logger = logging.getLogger(__name__)
+
+
+class DataService:
+    """聚合数据服务"""
+
+    # 批量接口支持的操作：操作名 -> (方法名, 允许的参数)
+    OPERATIONS = {
+        "user": ("get_user", ()),
+        "semester": ("get_semester", ()),
+        "course": ("get_course", ("semester_id",)),
+        "grade": ("get_grades", ("semester_id",)),
+        "exam": ("get_exams", ("semester_id",)),
+        "evaluation": ("get_pending_evaluations", ()),
+    }
+
+    def __init__(
+        self,
+        session: requests.Session,
+        user_info: Optional[Dict] = None,
+        refresh: bool = False,
+        username: Optional[str] = None,
+    ):
+        """
+        Args:
+            refresh: 为 True 时跳过结果缓存，重新从教务系统获取
+            username: token 对应的登录用户名，用于查询学生档案存储
+        """
+        self.session = session
+        self.user_info = user_info or {}
+        self.refresh = refresh
+        self.username = username
+
+    @classmethod
+    def from_auth(cls, auth: Tuple[requests.Session, Dict, str], refresh: bool = False) -> "DataService":
+        """由 require_auth 的结果创建，带上 token 对应的用户名"""
+        session, user_info, token = auth
+        return cls(session, user_info, refresh, username=get_token_service().get_username(token))
+
+    async def resolve_semester_id(self) -> Optional[str]:
+        """获取当前学期 ID（同一请求内只解析一次）"""
+        key = ("resolve_semester_id", id(self.session))
+        return await upstream.memoize(key, self._resolve_semester_id)
+
+    async def _resolve_semester_id(self) -> Optional[str]:
+        """先查全局学期目录，再并发探测 Cookie/页面，最后取学期列表中最新的学期"""
+        semester_id = await get_semester_catalog().get_current_id(self.session)
+        if semester_id:
+            return semester_id
+        
+        sem_service = SemesterService(self.session)
+        semester_id, source = await sem_service.probe_current_id(race=True)
+        logger.info(f"[data] Current semester {semester_id} from {source}")
+        if semester_id:
+            return semester_id
+
+        available = await sem_service.get_available()
+        if available.get("success") and available.get("semesters"):
+            # 学期列表已按倒序排列，第一个就是最新的
+            semester_id = available["semesters"][0].get("id")
+            logger.info(f"[data] Using latest semester from list: {semester_id}")
+        return semester_id
+
+    async def resolve_student_id(self) -> Optional[str]:
+        """获取学生 ID：优先使用登录时缓存的用户信息，其次是学生档案存储"""
+        student_id = self.user_info.get("student_id")
+        if student_id:
+            return student_id
+        stored = get_profile_store().get(self.username) if self.username else None
+        if stored:
+            return stored.student_id
+        key = ("resolve_student_id", id(self.session))
+        return await upstream.memoize(key, UserService(self.session).get_student_id)
+
+    async def get_profile(self) -> Dict:
+        """获取用户信息：缓存已完整时直接返回"""
+        if self.user_info.get("name") and self.user_info.get("student_id"):
+            return self.user_info
+        return await UserService(self.session).get_info()
+
+    async def get_dashboard(self) -> Dict:
+        """
+        获取首页数据
+
+        学期 ID 和学号只解析一次；用户信息、学期信息、待评教数与学期解析并发进行，
+        课表和考试在学期确定后并发获取。每个部分单独返回成功或失败。
+        """
+        async def pending_evaluations() -> Dict:
+            result = await self.get_pending_evaluations()
+            if not result.get("success"):
+                return result
+            return {"success": True, "total": result.get("total", 0)}
+
+        sections = {
+            "user": self.get_user(),
+            "semester": self.get_semester(),
+            "course": self.get_course(),
+            "exam": self.get_exams(),
+            "evaluation": pending_evaluations(),
+        }
+        results = await asyncio.gather(*(self._guard(name, coro) for name, coro in sections.items()))
+        return dict(zip(sections, results))
+
+    async def get_user(self) -> Dict:
+        return {"success": True, "data": await self.get_profile()}
+
+    async def get_semester(self) -> Dict:
+        """
+        获取学期信息：优先使用全局学期目录
+
+        refresh 只跳过本用户的结果缓存，不强制刷新全局目录（目录按有效期和学期切换日刷新）
+        """
+        catalog = await get_semester_catalog().get(self.session)
+        if catalog:
+            # 目录中没有当前学期时按本会话解析，结果不写回全局目录
+            current = catalog.get("current_semester") or await self.resolve_semester_id()
+            semesters = [
+                {**sem, "current": True} if sem.get("id") == current else sem
+                for sem in catalog.get("semesters", [])
+            ]
+            return {
+                "success": True,
+                "current_semester_id": current,
+                "semesters": semesters,
+            }
+        return await SemesterService(self.session).get_info()
+
+    async def get_course(self, semester_id: Optional[str] = None) -> Dict:
+        """获取课程表，不传学期时使用当前学期"""
+        semester_id = semester_id or await self.resolve_semester_id()
+        if not semester_id:
+            return {"success": False, "error": "无法获取当前学期ID，请稍后重试"}
+        student_id = await self.resolve_student_id()
+        if not student_id:
+            return {"success": False, "error": "无法获取学生ID"}
+        return await get_result_cache().get_or_load(
+            "course", student_id, semester_id,
+            lambda: CourseService(self.session).get_table(semester_id, student_id),
+            refresh=self.refresh,
+        )
+
+    async def get_grades(self, semester_id: Optional[str] = None) -> Dict:
+        service = GradeService(self.session)
+        if not semester_id:
+            return await service.get_grades(semester_id)
+        return await self._cached("grade", semester_id, lambda: service.get_grades(semester_id))
+
+    async def get_exams(self, semester_id: Optional[str] = None) -> Dict:
+        """获取考试安排，不传学期时使用当前学期"""
+        semester_id = semester_id or await self.resolve_semester_id()
+        return await self._cached("exam", semester_id, lambda: ExamService(self.session).get_exams(semester_id))
+
+    async def get_pending_evaluations(self) -> Dict:
+        return await self._cached("evaluation", None, EvaluationService(self.session).get_pending_evaluations)
+
+    async def invalidate_evaluations(self) -> None:
+        """提交评教后清除待评教列表缓存"""
+        student_id = await self.resolve_student_id()
+        if student_id:
+            get_result_cache().invalidate("evaluation", student_id)
+
+    async def _cached(self, dataset: str, semester_id: Optional[str], loader: Callable[[], Awaitable[Dict]]) -> Dict:
+        """经过结果缓存获取数据，无法确定学号时直接获取"""
+        student_id = await self.resolve_student_id()
+        if not student_id:
+            return await loader()
+        return await get_result_cache().get_or_load(dataset, student_id, semester_id, loader, refresh=self.refresh)
+
+    async def run_batch(self, operations: List[Dict]) -> List[Dict]:
+        """
+        并发执行多个操作，结果按请求顺序返回
+
+        Args:
+            operations: [{"op": "grade", "params": {"semester_id": "209"}}, ...]
+        """
+        coros = []
+        for item in operations:
+            op, params = item.get("op"), item.get("params") or {}
+            if op not in self.OPERATIONS:
+                coros.append(self._unknown(op))
+                continue
+            method, allowed = self.OPERATIONS[op]
+            kwargs = {k: v for k, v in params.items() if k in allowed}
+            coros.append(self._guard(op, getattr(self, method)(**kwargs)))
+        results = await asyncio.gather(*coros)
+        return [{"op": item.get("op"), **result} for item, result in zip(operations, results)]
+
+    @staticmethod
+    async def _unknown(op: Optional[str]) -> Dict:
+        return {"success": False, "error": f"不支持的操作: {op}"}
+
+    async def _guard(self, name: str, coro: Awaitable[Dict]) -> Dict:
+        """执行单个部分，失败只影响该部分"""
+        try:
+            return await coro
+        except UpstreamError as e:
+            return {"success": False, "error": str(e), "code": e.code}
+        except Exception as e:
+            logger.error(f"[data] {name} failed: {e}")
+            return {"success": False, "error": str(e)}
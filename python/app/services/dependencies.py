@@ -5,7 +5,7 @@
 """
 
 import logging
-from typing import Optional, Tuple
+from typing import AsyncIterator, Optional, Tuple
 from fastapi import Header, HTTPException, Depends
 import requests
 
@@ -23,10 +23,12 @@ def get_token_from_header(authorization: Optional[str] = Header(None)) -> Option
 
 async def require_auth(
     authorization: Optional[str] = Header(None),
-) -> Tuple[requests.Session, dict, str]:
+) -> AsyncIterator[Tuple[requests.Session, dict, str]]:
     """
     依赖注入：要求认证，返回会话和用户信息
     
+    会话来自进程内注册表，请求结束后把轮换的 cookie 写回持久存储
+    
     Usage:
         @router.get("/xxx")
         async def xxx(auth: Tuple = Depends(require_auth)):
@@ -56,7 +58,13 @@ async def require_auth(
         )
     
     session, user_info = result
-    return session, user_info, token
+    try:
+        yield session, user_info, token
+    finally:
+        try:
+            token_service.sync_cookies(token, session)
+        except Exception as e:
+            logger.warning(f"[auth] Cookie sync failed: {e}")
 
 
 async def optional_auth(
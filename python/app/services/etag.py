@@ -0,0 +1,44 @@
+"""
+ETag 条件请求
+
+对数据接口的响应内容计算稳定的哈希作为 ETag，
+客户端带上匹配的 If-None-Match 时返回 304，不再传输响应体。
+"""
+
+import hashlib
+import json
+from typing import Any, Dict
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+# 客户端每次使用前都要重新验证，只允许客户端自身缓存
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(payload: Dict) -> str:
+    """响应内容的哈希（键排序后序列化，与字典顺序无关）"""
+    body = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.blake2b(body.encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 是否命中（忽略弱校验前缀 W/）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def etag_response(request: Request, data: Any) -> Response:
+    """返回成功响应 {"success": true, "data": data}，带 ETag，命中 If-None-Match 时返回 304"""
+    payload = {"success": True, "data": data}
+    etag = compute_etag(payload)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=payload, headers=headers)
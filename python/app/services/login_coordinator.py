@@ -0,0 +1,240 @@
+"""
+登录合并服务
+
+同一账号的并发登录（重复点击、NestJS 重试）合并为一次 CAS 登录，
+所有等待者拿到同一个会话和用户信息。
+TokenService 连接了 Redis 时，通过 Redis 锁在多个 uvicorn worker 之间协调：
+等待者只复用它等待期间持锁者发布的结果，登录结束后才到达的请求（如 /auth/refresh）重新登录。
+等待时间不超过锁的有效期和请求的剩余时间；Redis 为同步客户端，命令放到线程中执行，不阻塞事件循环。
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import requests
+
+from ..core import CASAuth, AuthError, upstream
+from ..core.errors import DeadlineExceeded
+from ..core.singleflight import SingleFlight
+from .profile_store import get_profile_store
+from .token_service import get_token_service
+
+logger = logging.getLogger(__name__)
+
+
+class LoginCoordinator:
+    """登录合并器"""
+
+    def __init__(self, lock_ttl: int = 60, result_ttl: int = 15, poll_interval: float = 0.2, secret: bytes = b""):
+        """
+        Args:
+            secret: 结果校验值的 HMAC 密钥，多个 worker 使用同一个密钥才能复用彼此的结果
+        """
+        self._lock_ttl = lock_ttl
+        self._result_ttl = result_ttl
+        self._poll_interval = poll_interval
+        self._secret = secret or secrets.token_bytes(32)
+        self._flights = SingleFlight("logins")
+        self._remote_shared = 0
+
+    def _account_key(self, username: str, password: str) -> str:
+        """进程内合并 key（不落盘）"""
+        return hashlib.sha256(f"{username}:{password}".encode()).hexdigest()
+
+    def _lock_key(self, username: str) -> str:
+        return f"jwxt:login:lock:{username}"
+
+    def _result_key(self, username: str) -> str:
+        return f"jwxt:login:result:{username}"
+
+    def _verifier(self, salt: str, username: str, password: str) -> str:
+        """结果校验值：只有密码一致的等待者才能复用结果（密钥不在 Redis 中，无法离线反推密码）"""
+        message = f"{salt}:{username}:{password}".encode()
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    async def login(self, username: str, password: str) -> Tuple[requests.Session, Dict]:
+        """
+        登录并获取用户信息
+
+        Returns:
+            (session, user_info) 元组
+
+        Raises:
+            AuthError: 登录失败（所有等待者收到同一个错误）
+        """
+        key = self._account_key(username, password)
+        return await self._flights.do(key, lambda: self._login(username, password))
+
+    async def _login(self, username: str, password: str) -> Tuple[requests.Session, Dict]:
+        redis_client = get_token_service().redis
+        if redis_client is None:
+            return await self._do_login(username, password)
+
+        lock_key = self._lock_key(username)
+        lock_value = secrets.token_hex(8)
+        max_wait = self._lock_ttl
+        scope = upstream.current_scope()
+        remaining = scope.remaining() if scope else None
+        if remaining is not None:
+            max_wait = min(max_wait, remaining)
+        deadline = time.monotonic() + max_wait
+        # 等待期间见过的持锁者，只复用它们发布的结果
+        holders: Set[str] = set()
+
+        while True:
+            shared = await self._read_result(redis_client, username, password, holders) if holders else None
+            if shared:
+                self._remote_shared += 1
+                logger.info(f"[login] Reused login of another worker for {username}")
+                return shared
+
+            try:
+                acquired = await asyncio.to_thread(
+                    redis_client.set, lock_key, lock_value, nx=True, px=self._lock_ttl * 1000
+                )
+                holder = None if acquired else await asyncio.to_thread(redis_client.get, lock_key)
+            except Exception as e:
+                logger.warning(f"[login] Redis lock failed, logging in locally: {e}")
+                return await self._do_login(username, password)
+
+            if acquired:
+                try:
+                    return await self._login_and_publish(redis_client, username, password, lock_value)
+                finally:
+                    await self._release(redis_client, lock_key, lock_value)
+
+            if holder:
+                holders.add(holder)
+
+            left = deadline - time.monotonic()
+            if left <= 0:
+                logger.warning(f"[login] Waited {max_wait:.1f}s for login of {username}, giving up")
+                raise DeadlineExceeded("请求已到截止时间，其他 worker 的登录仍未完成")
+
+            await asyncio.sleep(min(self._poll_interval, left))
+
+    async def _do_login(self, username: str, password: str) -> Tuple[requests.Session, Dict]:
+        """执行 CAS 登录并获取用户信息（使用登录舱壁，不占用数据查询的名额）"""
+        with upstream.bulkhead("auth"):
+            session = await CASAuth().login(username, password)
+            user_info = await get_profile_store().load_user_info(username, session)
+        return session, user_info
+
+    async def _login_and_publish(
+        self, redis_client, username: str, password: str, lock_value: str
+    ) -> Tuple[requests.Session, Dict]:
+        """登录并把结果发布给其他 worker 的等待者"""
+        salt = secrets.token_hex(8)
+        base = {"holder": lock_value, "salt": salt, "verifier": self._verifier(salt, username, password)}
+        try:
+            session, user_info = await self._do_login(username, password)
+        except AuthError as e:
+            # 只发布密码被拒绝的错误；网络等临时错误让等待者自己重试
+            if e.credential_rejected:
+                await self._publish(redis_client, username, {**base, "error": str(e)})
+            raise
+
+        payload = {
+            **base,
+            "cookies": {cookie.name: cookie.value for cookie in session.cookies},
+            "user_info": user_info,
+        }
+        await self._publish(redis_client, username, payload)
+        return session, user_info
+
+    async def _publish(self, redis_client, username: str, payload: Dict) -> None:
+        try:
+            await asyncio.to_thread(
+                redis_client.setex, self._result_key(username), self._result_ttl, json.dumps(payload, ensure_ascii=False)
+            )
+        except Exception as e:
+            logger.warning(f"[login] Publish result failed: {e}")
+
+    async def _read_result(
+        self, redis_client, username: str, password: str, holders: Set[str]
+    ) -> Optional[Tuple[requests.Session, Dict]]:
+        """读取等待期间持锁的 worker 发布的登录结果"""
+        try:
+            data = await asyncio.to_thread(redis_client.get, self._result_key(username))
+        except Exception:
+            return None
+        if not data:
+            return None
+
+        payload = json.loads(data)
+        if payload.get("holder") not in holders:
+            return None
+        expected = self._verifier(payload.get("salt", ""), username, password)
+        if not hmac.compare_digest(payload.get("verifier", ""), expected):
+            return None
+        if payload.get("error"):
+            raise AuthError(payload["error"], credential_rejected=True)
+        return upstream.new_session(payload.get("cookies") or {}), payload.get("user_info") or {}
+
+    async def _release(self, redis_client, lock_key: str, lock_value: str) -> None:
+        """只释放自己持有的锁"""
+        try:
+            if await asyncio.to_thread(redis_client.get, lock_key) == lock_value:
+                await asyncio.to_thread(redis_client.delete, lock_key)
+        except Exception as e:
+            logger.warning(f"[login] Release lock failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """获取统计"""
+        stats = self._flights.get_stats()
+        stats["remote_shared"] = self._remote_shared
+        return stats
+
+
+def _load_secret(secret: str, secret_file: str) -> bytes:
+    """读取 HMAC 密钥：优先使用配置，否则读取本地密钥文件（不存在时生成，同一台机器的 worker 共用）"""
+    if secret:
+        return secret.encode()
+
+    path = Path(secret_file)
+    if not path.is_absolute():
+        path = Path(__file__).parent.parent.parent / secret_file
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # O_EXCL：多个 worker 同时启动时只有一个写入
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+        for _ in range(10):
+            value = path.read_text().strip()
+            if value:
+                return value.encode()
+            time.sleep(0.05)
+    except OSError as e:
+        logger.warning(f"[login] Load secret failed, login results are not shared across workers: {e}")
+    return b""
+
+
+# 全局实例
+_coordinator: Optional[LoginCoordinator] = None
+
+
+def get_login_coordinator() -> LoginCoordinator:
+    """获取全局登录合并器"""
+    global _coordinator
+    if _coordinator is None:
+        from ..config import get_settings
+        settings = get_settings()
+        _coordinator = LoginCoordinator(
+            lock_ttl=settings.login_lock_ttl,
+            result_ttl=settings.login_result_ttl,
+            secret=_load_secret(settings.login_result_secret, settings.login_secret_file),
+        )
+    return _coordinator
@@ -0,0 +1,220 @@
+"""
+学生档案存储
+
+内部学生 ID（课表查询的 ids 参数）和基本档案（姓名、院系、专业、班级等）
+对一个账号来说不会变化。首次登录时保存，之后的登录、刷新 token、服务重启都直接复用，
+不再抓取页面解析。后台按 profile_recheck_interval 低频复核一次。
+
+Redis（TokenService 已连接时）为主存储，多个 worker 共享；否则写入本地 JSON 文件。
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+from ..core import UserService, upstream
+from ..core.errors import UpstreamError
+from ..core.user import DETAIL_FIELDS, WEEK_FIELDS
+from .token_service import get_token_service
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "jwxt:profile"
+
+
+@dataclass
+class StoredProfile:
+    """账号的学生 ID 与基本档案"""
+    username: str
+    student_id: str
+    profile: Dict[str, Optional[str]] = field(default_factory=dict)
+    updated_at: float = 0.0
+    checked_at: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'StoredProfile':
+        return cls(**data)
+
+
+class ProfileStore:
+    """学生档案存储"""
+
+    def __init__(self, store_file: str = "data/profiles.json", recheck_interval: int = 7 * 24 * 3600):
+        self._recheck_interval = recheck_interval
+        self._lock = threading.RLock()
+        self._profiles: Dict[str, StoredProfile] = {}
+        self._rechecking: set = set()
+        self._stats = {"hits": 0, "misses": 0, "saved": 0, "rechecked": 0, "changed": 0}
+
+        if not Path(store_file).is_absolute():
+            script_dir = Path(__file__).parent.parent.parent
+            self._store_file = script_dir / store_file
+        else:
+            self._store_file = Path(store_file)
+        self._load_from_disk()
+
+    def _redis_key(self, username: str) -> str:
+        return f"{KEY_PREFIX}:{username}"
+
+    def _load_from_disk(self) -> None:
+        if not self._store_file.exists():
+            return
+        try:
+            with open(self._store_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._profiles = {name: StoredProfile.from_dict(item) for name, item in data.items()}
+        except Exception as e:
+            logger.error(f"加载档案文件失败: {e}")
+
+    def _save_to_disk(self) -> None:
+        try:
+            self._store_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self._store_file.with_suffix('.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({name: p.to_dict() for name, p in self._profiles.items()}, f, ensure_ascii=False, indent=2)
+            temp_file.replace(self._store_file)
+        except Exception as e:
+            logger.error(f"保存档案文件失败: {e}")
+
+    def get(self, username: str) -> Optional[StoredProfile]:
+        """获取已保存的档案"""
+        with self._lock:
+            stored = self._profiles.get(username)
+        if stored is None:
+            redis_client = get_token_service().redis
+            if redis_client is not None:
+                try:
+                    data = redis_client.get(self._redis_key(username))
+                except Exception as e:
+                    logger.warning(f"[profile] Redis get failed: {e}")
+                    data = None
+                if data:
+                    stored = StoredProfile.from_dict(json.loads(data))
+                    with self._lock:
+                        self._profiles[username] = stored
+
+        with self._lock:
+            self._stats["hits" if stored else "misses"] += 1
+        return stored
+
+    def save(self, username: str, user_info: Dict) -> None:
+        """从完整用户信息中保存学生 ID 和档案（信息不完整时不保存）"""
+        student_id = user_info.get("student_id")
+        profile = {key: user_info.get(key) for key in DETAIL_FIELDS}
+        if not student_id or not profile.get("name"):
+            return
+
+        now = time.time()
+        with self._lock:
+            previous = self._profiles.get(username)
+            if previous and previous.student_id == student_id and previous.profile == profile:
+                previous.checked_at = now
+                stored = previous
+            else:
+                if previous:
+                    self._stats["changed"] += 1
+                    logger.info(f"[profile] Profile of {username} changed")
+                stored = StoredProfile(username, student_id, profile, updated_at=now, checked_at=now)
+                self._profiles[username] = stored
+                self._stats["saved"] += 1
+
+        redis_client = get_token_service().redis
+        if redis_client is None:
+            with self._lock:
+                self._save_to_disk()
+            return
+        try:
+            redis_client.set(self._redis_key(username), json.dumps(stored.to_dict(), ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"[profile] Redis set failed: {e}")
+
+    def needs_recheck(self, stored: StoredProfile) -> bool:
+        return time.time() - stored.checked_at > self._recheck_interval
+
+    async def load_user_info(self, username: str, session: requests.Session) -> Dict:
+        """
+        获取登录用户信息
+
+        已保存档案时只获取当前周次，学生 ID 和档案直接使用存储，
+        到期时在后台复核；否则完整抓取并保存。
+        """
+        stored = self.get(username)
+        if stored is None:
+            user_info = await UserService(session).get_info()
+            if not {"student_id", "detail"} & set(user_info.get("partial", [])):
+                self.save(username, user_info)
+            return user_info
+
+        user_info = {"success": True, "student_id": stored.student_id}
+        user_info.update(stored.profile)
+        try:
+            user_info.update(await UserService(session).get_current_week())
+        except UpstreamError as e:
+            logger.warning(f"[profile] Current week unavailable for {username}: {e}")
+            user_info.update(dict.fromkeys(WEEK_FIELDS))
+            user_info["partial"] = ["current_week"]
+        for cookie in session.cookies:
+            if cookie.name == "semester.id":
+                user_info["current_semester"] = cookie.value
+                break
+
+        if self.needs_recheck(stored):
+            self._schedule_recheck(username, session)
+        return user_info
+
+    def _schedule_recheck(self, username: str, session: requests.Session) -> None:
+        with self._lock:
+            if username in self._rechecking:
+                return
+            self._rechecking.add(username)
+        asyncio.ensure_future(self._recheck(username, session))
+
+    async def _recheck(self, username: str, session: requests.Session) -> None:
+        """后台复核学生 ID 和档案（独立的请求作用域，不受登录请求截止时间影响）"""
+        try:
+            with upstream.request_scope(timeout=60), upstream.bulkhead("read"):
+                service = UserService(session)
+                student_id = await service.get_student_id()
+                detail = await service.get_detail()
+            self.save(username, {"student_id": student_id, **detail})
+            with self._lock:
+                self._stats["rechecked"] += 1
+        except Exception as e:
+            logger.warning(f"[profile] Recheck failed for {username}: {e}")
+        finally:
+            with self._lock:
+                self._rechecking.discard(username)
+
+    def get_stats(self) -> Dict:
+        """获取统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["profiles"] = len(self._profiles)
+        return stats
+
+
+# 全局实例
+_store: Optional[ProfileStore] = None
+
+
+def get_profile_store() -> ProfileStore:
+    """获取全局学生档案存储"""
+    global _store
+    if _store is None:
+        from ..config import get_settings
+        settings = get_settings()
+        _store = ProfileStore(
+            store_file=settings.profile_store_file,
+            recheck_interval=settings.profile_recheck_interval,
+        )
+    return _store
@@ -0,0 +1,192 @@
+"""
+解析结果缓存
+
+按 (学号, 学期, 数据集) 缓存课程表、成绩、考试、待评教等解析后的结果，
+每个数据集单独设置有效期。进程内 LRU 在前，Redis（TokenService 已连接时）在后，
+多个 worker 共享。只缓存 success 为 true 的结果；列表为空的结果只缓存 empty_ttl 秒，
+避免会话异常时的空结果长时间挡住正常数据。
+
+写操作（如提交评教）后主动失效：每个 (学号, 数据集) 有一个代数，保存在 Redis 中并作为 key 的一部分，
+失效时代数加一。每次读取先取当前代数，其他 worker 进程内缓存的旧结果因此不会再命中。
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .token_service import get_token_service
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "jwxt:data"
+
+# 各数据集结果中的列表字段，为空时按 empty_ttl 缓存
+LIST_FIELDS = ("courses", "grades", "exams", "evaluations")
+
+
+class ResultCache:
+    """解析结果缓存"""
+
+    def __init__(self, ttls: Dict[str, int], max_entries: int = 5000, empty_ttl: int = 60):
+        self._ttls = ttls
+        self._empty_ttl = empty_ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._generations: Dict[Tuple[str, str], int] = {}  # 没有 Redis 时的进程内代数
+        self._stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "bypassed": 0, "invalidated": 0}
+
+    def _key(self, dataset: str, student_id: str, semester_id: Optional[str], generation: int) -> str:
+        return f"{KEY_PREFIX}:{student_id}:{semester_id or 'current'}:{dataset}:{generation}"
+
+    def _generation_key(self, dataset: str, student_id: str) -> str:
+        return f"{KEY_PREFIX}:gen:{student_id}:{dataset}"
+
+    def _generation(self, dataset: str, student_id: str) -> int:
+        """(学号, 数据集) 的当前代数"""
+        redis_client = get_token_service().redis
+        if redis_client is not None:
+            try:
+                return int(redis_client.get(self._generation_key(dataset, student_id)) or 0)
+            except Exception as e:
+                logger.warning(f"[result_cache] Redis get generation failed: {e}")
+        with self._lock:
+            return self._generations.get((student_id, dataset), 0)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    async def get_or_load(
+        self,
+        dataset: str,
+        student_id: str,
+        semester_id: Optional[str],
+        loader: Callable[[], Awaitable[Dict]],
+        refresh: bool = False,
+    ) -> Dict:
+        """
+        读取缓存，未命中时调用 loader 并写入缓存
+
+        Args:
+            refresh: 为 True 时跳过读取，直接重新获取并更新缓存
+        """
+        ttl = self._ttls.get(dataset, 0)
+        if ttl <= 0:
+            return await loader()
+
+        key = self._key(dataset, student_id, semester_id, self._generation(dataset, student_id))
+        if refresh:
+            self._count("bypassed")
+        else:
+            cached = self._get(key)
+            if cached is not None:
+                return cached
+            self._count("misses")
+
+        result = await loader()
+        if result.get("success"):
+            if self._is_empty(result):
+                ttl = min(ttl, self._empty_ttl)
+            if ttl > 0:
+                self._put(key, result, ttl)
+        return result
+
+    @staticmethod
+    def _is_empty(result: Dict) -> bool:
+        return any(field in result and not result[field] for field in LIST_FIELDS)
+
+    def _get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+
+        redis_client = get_token_service().redis
+        if redis_client is None:
+            return None
+        try:
+            data = redis_client.get(key)
+            ttl = redis_client.ttl(key) if data else 0
+        except Exception as e:
+            logger.warning(f"[result_cache] Redis get failed: {e}")
+            return None
+        if not data or ttl <= 0:
+            return None
+
+        result = json.loads(data)
+        self._put_memory(key, result, ttl)
+        self._count("redis_hits")
+        return result
+
+    def _put(self, key: str, result: Dict, ttl: int) -> None:
+        self._put_memory(key, result, ttl)
+        redis_client = get_token_service().redis
+        if redis_client is None:
+            return
+        try:
+            redis_client.setex(key, ttl, json.dumps(result, ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"[result_cache] Redis set failed: {e}")
+
+    def _put_memory(self, key: str, result: Dict, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, dataset: str, student_id: str) -> None:
+        """使该学生所有学期的该数据集缓存失效（代数加一，旧 key 自然过期）"""
+        prefix, suffix = f"{KEY_PREFIX}:{student_id}:", f":{dataset}:"
+        with self._lock:
+            generation_key = (student_id, dataset)
+            self._generations[generation_key] = self._generations.get(generation_key, 0) + 1
+            for key in [k for k in self._entries if k.startswith(prefix) and suffix in k]:
+                del self._entries[key]
+            self._stats["invalidated"] += 1
+
+        redis_client = get_token_service().redis
+        if redis_client is None:
+            return
+        try:
+            key = self._generation_key(dataset, student_id)
+            redis_client.incr(key)
+            # 代数要比任何数据 key 活得久，过期后归零时旧代数的数据已经过期
+            redis_client.expire(key, 2 * max(self._ttls.values(), default=0) + 3600)
+        except Exception as e:
+            logger.warning(f"[result_cache] Redis invalidate failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """获取统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._entries)
+        stats["ttls"] = self._ttls
+        return stats
+
+
+# 全局实例
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """获取全局解析结果缓存"""
+    global _cache
+    if _cache is None:
+        from ..config import get_settings
+        settings = get_settings()
+        _cache = ResultCache(
+            ttls=settings.result_cache_ttls,
+            max_entries=settings.result_cache_max_entries,
+            empty_ttl=settings.result_cache_empty_ttl,
+        )
+    return _cache
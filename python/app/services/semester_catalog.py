@@ -0,0 +1,195 @@
+"""
+全局学期目录
+
+学期列表和当前学期对所有学生都相同，不必每个请求都访问教务系统。
+目录在进程内共享并写入 Redis（TokenService 已连接时），多个 worker 共用：
+- 超过 semester_catalog_ttl 后先返回旧数据，同时用当前请求的会话在后台刷新
+- 跨过学期切换日（semester_boundaries）或目录为空时同步刷新，
+  保证换学期后不会返回旧的当前学期
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+
+from ..core import SemesterService, upstream
+from ..core.errors import UpstreamError
+from ..core.singleflight import SingleFlight
+from .token_service import get_token_service
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = "jwxt:semester:catalog"
+REDIS_TTL = 30 * 24 * 3600  # Redis 中保留的时间，过期判断使用 fetched_at
+
+
+class SemesterCatalog:
+    """全局学期目录"""
+
+    def __init__(self, ttl: int = 6 * 3600, boundaries: Optional[List[str]] = None):
+        """
+        Args:
+            ttl: 目录有效期（秒）
+            boundaries: 学期切换日列表（"MM-DD"），跨过切换日后立即刷新
+        """
+        self._ttl = ttl
+        self._boundaries = boundaries or []
+        self._lock = threading.Lock()
+        self._data: Optional[Dict] = None
+        self._flights = SingleFlight("semester_catalog")
+        self._refreshing: Optional[asyncio.Future] = None
+        self._stats = {"hits": 0, "stale_hits": 0, "redis_loads": 0, "refreshes": 0, "refresh_failures": 0}
+
+    def _next_boundary(self, after: float) -> Optional[float]:
+        """after 之后最近的学期切换时间点"""
+        year = datetime.fromtimestamp(after).year
+        candidates = []
+        for boundary in self._boundaries:
+            month, day = (int(part) for part in boundary.split("-"))
+            for y in (year, year + 1):
+                ts = datetime(y, month, day).timestamp()
+                if ts > after:
+                    candidates.append(ts)
+        return min(candidates) if candidates else None
+
+    def _crossed_boundary(self, data: Dict) -> bool:
+        boundary = self._next_boundary(data["fetched_at"])
+        return boundary is not None and time.time() >= boundary
+
+    def _is_fresh(self, data: Dict) -> bool:
+        return time.time() - data["fetched_at"] <= self._ttl and not self._crossed_boundary(data)
+
+    def _load_redis(self) -> Optional[Dict]:
+        redis_client = get_token_service().redis
+        if redis_client is None:
+            return None
+        try:
+            data = redis_client.get(REDIS_KEY)
+        except Exception as e:
+            logger.warning(f"[semester_catalog] Redis get failed: {e}")
+            return None
+        return json.loads(data) if data else None
+
+    def _store(self, data: Dict) -> None:
+        with self._lock:
+            self._data = data
+        redis_client = get_token_service().redis
+        if redis_client is None:
+            return
+        try:
+            redis_client.setex(REDIS_KEY, REDIS_TTL, json.dumps(data, ensure_ascii=False))
+        except Exception as e:
+            logger.warning(f"[semester_catalog] Redis set failed: {e}")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    async def get(self, session: requests.Session) -> Optional[Dict]:
+        """
+        获取学期目录
+
+        Args:
+            session: 目录需要刷新时使用的会话
+
+        Returns:
+            {"semesters": [...], "current_semester": id, "fetched_at": ts}，获取失败且没有旧数据时为 None
+        """
+        data = self._data
+        if data is None or not self._is_fresh(data):
+            # 其他 worker 可能已经刷新过
+            shared = self._load_redis()
+            if shared and (data is None or shared["fetched_at"] > data["fetched_at"]):
+                self._count("redis_loads")
+                data = shared
+                with self._lock:
+                    self._data = data
+
+        if data is None or self._crossed_boundary(data):
+            return await self._flights.do("refresh", lambda: self._refresh(session))
+
+        if self._is_fresh(data):
+            self._count("hits")
+        else:
+            # 先返回旧数据，后台刷新
+            self._count("stale_hits")
+            with self._lock:
+                if self._refreshing is None or self._refreshing.done():
+                    self._refreshing = asyncio.ensure_future(self._background_refresh(session))
+        return data
+
+    async def _background_refresh(self, session: requests.Session) -> None:
+        """后台刷新（独立的请求作用域，不受触发请求的截止时间影响，也不占用它的舱壁）"""
+        try:
+            with upstream.request_scope(timeout=60), upstream.bulkhead("read"):
+                await self._flights.do("refresh", lambda: self._refresh(session))
+        except Exception as e:
+            logger.warning(f"[semester_catalog] Background refresh failed: {e}")
+
+    async def _refresh(self, session: requests.Session) -> Optional[Dict]:
+        """
+        通过 dataQuery 接口重新获取学期列表
+
+        当前学期只取 dataQuery 的 selected 标记，不使用触发刷新的会话的 cookie / 页面探测
+        （那是该学生最近浏览的学期，不能共享给所有人）；没有标记时只保存列表，不保存当前学期。
+        """
+        try:
+            available = await SemesterService(session).get_available(probe_current=False)
+        except UpstreamError as e:
+            self._count("refresh_failures")
+            logger.warning(f"[semester_catalog] Refresh failed: {e}")
+            return self._data
+        if not available.get("success") or not available.get("semesters"):
+            self._count("refresh_failures")
+            logger.warning(f"[semester_catalog] Refresh failed: {available.get('error')}")
+            return self._data
+
+        data = {
+            "semesters": available["semesters"],
+            "current_semester": available.get("current_semester"),
+            "fetched_at": time.time(),
+        }
+        self._count("refreshes")
+        self._store(data)
+        logger.info(f"[semester_catalog] Refreshed: {len(data['semesters'])} semesters, current {data['current_semester']}")
+        return data
+
+    async def get_current_id(self, session: requests.Session) -> Optional[str]:
+        """获取当前学期 ID"""
+        data = await self.get(session)
+        return data.get("current_semester") if data else None
+
+    def get_stats(self) -> Dict:
+        """获取统计"""
+        with self._lock:
+            data = self._data
+            stats = dict(self._stats)
+        stats["loaded"] = data is not None
+        if data:
+            stats["current_semester"] = data.get("current_semester")
+            stats["age_seconds"] = int(time.time() - data["fetched_at"])
+            stats["fresh"] = self._is_fresh(data)
+        return stats
+
+
+# 全局实例
+_catalog: Optional[SemesterCatalog] = None
+
+
+def get_semester_catalog() -> SemesterCatalog:
+    """获取全局学期目录"""
+    global _catalog
+    if _catalog is None:
+        from ..config import get_settings
+        settings = get_settings()
+        _catalog = SemesterCatalog(
+            ttl=settings.semester_catalog_ttl,
+            boundaries=settings.semester_boundaries,
+        )
+    return _catalog
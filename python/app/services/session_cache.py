@@ -12,6 +12,8 @@ import json
 from pathlib import Path
 import logging
 
+from ..core import upstream
+
 logger = logging.getLogger(__name__)
 
 
@@ -94,10 +96,7 @@ class SessionCache:
             logger.error(f"保存缓存文件失败: {e}")
 
     def _session_from_cookies(self, cookies_dict: Dict[str, str]) -> requests.Session:
-        session = requests.Session()
-        for name, value in cookies_dict.items():
-            session.cookies.set(name, value)
-        return session
+        return upstream.new_session(cookies_dict)
     
     def _cookies_to_dict(self, session: requests.Session) -> Dict[str, str]:
         return {cookie.name: cookie.value for cookie in session.cookies}
@@ -0,0 +1,138 @@
+"""
+活跃会话注册表
+
+按 token 在进程内保存已构建好的 requests.Session，热请求直接复用，
+不再每次从 Redis 解码 cookie 重新组装。请求结束后如果教务系统轮换了
+cookie，由 TokenService.sync_cookies 写回持久存储。
+"""
+
+import time
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LiveSession:
+    """进程内的活跃会话"""
+    token: str
+    username: str
+    session: requests.Session
+    user_info: Dict
+    expires_at: float
+    cookies: Dict[str, str]  # 最近一次与持久存储同步的 cookie
+    last_used: float
+    validated_at: float
+
+    def is_expired(self) -> bool:
+        return time.time() > self.expires_at
+
+
+class SessionRegistry:
+    """活跃会话注册表（LRU + 空闲超时）"""
+
+    def __init__(self, max_size: int = 1000, idle_timeout: int = 900, revalidate_interval: int = 30):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, LiveSession]" = OrderedDict()
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._revalidate_interval = revalidate_interval
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, token: str) -> Optional[LiveSession]:
+        """获取活跃会话，过期或空闲过久返回 None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.is_expired() or now - entry.last_used > self._idle_timeout:
+                del self._entries[token]
+                self._misses += 1
+                return None
+            entry.last_used = now
+            self._entries.move_to_end(token)
+            self._hits += 1
+            return entry
+
+    def peek(self, token: str) -> Optional[LiveSession]:
+        """查看会话，不更新 LRU 与统计"""
+        with self._lock:
+            return self._entries.get(token)
+
+    def needs_revalidation(self, entry: LiveSession) -> bool:
+        """是否需要与持久存储核对（跨进程登出 / 刷新）"""
+        return time.time() - entry.validated_at > self._revalidate_interval
+
+    def put(
+        self,
+        token: str,
+        username: str,
+        session: requests.Session,
+        user_info: Dict,
+        expires_at: float,
+        cookies: Dict[str, str],
+    ) -> LiveSession:
+        """登记活跃会话"""
+        now = time.time()
+        entry = LiveSession(
+            token=token,
+            username=username,
+            session=session,
+            user_info=user_info,
+            expires_at=expires_at,
+            cookies=dict(cookies),
+            last_used=now,
+            validated_at=now,
+        )
+        with self._lock:
+            self._entries[token] = entry
+            self._entries.move_to_end(token)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return entry
+
+    def discard(self, token: str) -> bool:
+        """移除会话"""
+        with self._lock:
+            return self._entries.pop(token, None) is not None
+
+    def get_stats(self) -> Dict:
+        """获取统计"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "idle_timeout": self._idle_timeout,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+# 全局实例
+_registry: Optional[SessionRegistry] = None
+
+
+def get_session_registry() -> SessionRegistry:
+    """获取全局活跃会话注册表"""
+    global _registry
+    if _registry is None:
+        from ..config import get_settings
+        settings = get_settings()
+        _registry = SessionRegistry(
+            max_size=settings.session_registry_max_size,
+            idle_timeout=settings.session_registry_idle_timeout,
+            revalidate_interval=settings.session_registry_revalidate,
+        )
+    return _registry
@@ -16,6 +16,9 @@ import requests
 import redis
 from pathlib import Path
 
+from ..core import upstream
+from .session_registry import get_session_registry
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,6 +58,7 @@ class TokenService:
         self._redis: Optional[redis.Redis] = None
         self._redis_url = redis_url
         self._fallback_cache: Dict[str, TokenSession] = {}  # Redis 不可用时的后备缓存
+        self._live = get_session_registry()  # 进程内活跃会话
         
         try:
             self._redis = redis.from_url(redis_url, decode_responses=True)
@@ -64,6 +68,11 @@ class TokenService:
             logger.warning(f"Redis 连接失败，使用内存缓存: {e}")
             self._redis = None
     
+    @property
+    def redis(self) -> Optional[redis.Redis]:
+        """Redis 客户端（不可用时为 None）"""
+        return self._redis
+    
     def _generate_token(self) -> str:
         """生成安全的随机 token"""
         return secrets.token_urlsafe(32)
@@ -73,11 +82,8 @@ class TokenService:
         return f"jwxt:token:{token}"
     
     def _session_from_cookies(self, cookies_dict: Dict[str, str]) -> requests.Session:
-        """从 cookies 字典创建 requests.Session"""
-        session = requests.Session()
-        for name, value in cookies_dict.items():
-            session.cookies.set(name, value)
-        return session
+        """从 cookies 字典创建 requests.Session（共享连接池）"""
+        return upstream.new_session(cookies_dict)
     
     def _cookies_to_dict(self, session: requests.Session) -> Dict[str, str]:
         """将 requests.Session 的 cookies 转为字典"""
@@ -127,6 +133,8 @@ class TokenService:
         else:
             self._fallback_cache[token] = token_session
         
+        self._live.put(token, username, session, user_info, token_session.expires_at, token_session.cookies)
+        
         logger.info(f"[TokenService] Created token for {username}, expires in {self._token_ttl}s")
         return token, self._token_ttl
     
@@ -140,23 +148,72 @@ class TokenService:
         Returns:
             (session, user_info) 或 None（token 无效/过期）
         """
+        # 热路径：直接复用进程内的活跃会话
+        live = self._live.get(token)
+        if live and not self._live.needs_revalidation(live):
+            return live.session, live.user_info
+        
         token_session = self._get_token_session(token)
         if not token_session:
+            self._live.discard(token)
             return None
         
         if token_session.is_expired():
+            self._live.discard(token)
             self._remove_token(token)
             return None
         
+        # 与持久存储核对：cookie 未被其他进程改写则继续使用活跃会话
+        if live and live.cookies == token_session.cookies:
+            live.validated_at = time.time()
+            live.expires_at = token_session.expires_at
+            live.user_info = token_session.user_info
+            return live.session, live.user_info
+        
         # 更新最后使用时间
         token_session.last_used = time.time()
         self._update_token_session(token, token_session)
         
         session = self._session_from_cookies(token_session.cookies)
+        self._live.put(
+            token, token_session.username, session,
+            token_session.user_info, token_session.expires_at, token_session.cookies
+        )
         return session, token_session.user_info
     
+    def sync_cookies(self, token: str, session: requests.Session) -> bool:
+        """
+        将请求过程中教务系统轮换的 cookie 写回持久存储
+        
+        Returns:
+            是否发生了写回
+        """
+        cookies = self._cookies_to_dict(session)
+        live = self._live.peek(token)
+        if live and live.session is session and live.cookies == cookies:
+            return False
+        
+        token_session = self._get_token_session(token)
+        if not token_session:
+            return False
+        if token_session.cookies == cookies:
+            if live and live.session is session:
+                live.cookies = cookies
+            return False
+        
+        token_session.cookies = cookies
+        token_session.last_used = time.time()
+        self._update_token_session(token, token_session)
+        if live and live.session is session:
+            live.cookies = cookies
+        logger.info(f"[TokenService] Synced rotated cookies for {token_session.username}")
+        return True
+    
     def get_username(self, token: str) -> Optional[str]:
-        """通过 token 获取用户名"""
+        """通过 token 获取用户名（优先使用进程内的活跃会话）"""
+        live = self._live.peek(token)
+        if live and not live.is_expired():
+            return live.username
         token_session = self._get_token_session(token)
         if token_session and not token_session.is_expired():
             return token_session.username
@@ -183,11 +240,16 @@ class TokenService:
         token_session.expires_at = time.time() + self._token_ttl
         
         self._update_token_session(token, token_session)
+        self._live.put(
+            token, token_session.username, session,
+            token_session.user_info, token_session.expires_at, token_session.cookies
+        )
         logger.info(f"[TokenService] Refreshed session for token")
         return True
     
     def invalidate_token(self, token: str) -> bool:
         """使 token 失效"""
+        self._live.discard(token)
         return self._remove_token(token)
     
     def _get_token_session(self, token: str) -> Optional[TokenSession]:
@@ -242,6 +304,7 @@ class TokenService:
             "session_ttl": self._session_ttl,
             "redis_connected": self._redis is not None,
             "fallback_cache_size": len(self._fallback_cache),
+            "live_sessions": self._live.get_stats(),
         }
         
         if self._redis:
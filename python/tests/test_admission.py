@@ -0,0 +1,104 @@
+"""
+入口准入控制测试
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.services import admission
+from app.services.admission import AdmissionController, AdmissionMiddleware
+from app.services.etag import etag_response
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = AdmissionController(
+        limits={"read": {"max_in_flight": 2, "max_wait": 10}},
+        routes={"/course": "read", "/stream": "read"},
+    )
+    monkeypatch.setattr(admission, "_controller", controller)
+    return controller
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/course")
+    async def course(request: Request):
+        return etag_response(request, {"courses": [1]})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"data: 1\n\n"
+            yield b"data: 2\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    app.add_middleware(AdmissionMiddleware)
+    return app
+
+
+def in_flight(controller: AdmissionController) -> int:
+    return controller.get_stats()["read"]["in_flight"]
+
+
+def test_in_flight_released_when_client_disconnects(controller):
+    """客户端在响应体发送前断开（发送失败）：在途计数仍要归还"""
+    from app.main import app
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("client disconnected")
+
+    async def main():
+        for _ in range(5):
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+                "method": "GET", "scheme": "http", "path": "/course", "raw_path": b"/course",
+                "query_string": b"", "root_path": "", "headers": [],
+                "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+            }
+            with pytest.raises(OSError):
+                await app(scope, receive, send)
+
+    asyncio.run(main())
+    assert in_flight(controller) == 0
+
+
+def test_in_flight_released_after_stream(controller):
+    client = TestClient(make_app())
+    resp = client.get("/stream")
+    assert resp.status_code == 200
+    assert "data: 2" in resp.text
+    assert in_flight(controller) == 0
+
+
+def test_shed_replays_stale_response_with_etag(controller):
+    client = TestClient(make_app())
+    fresh = client.get("/course", headers={"Authorization": "Bearer a"})
+    assert fresh.status_code == 200
+
+    # 占满名额后再请求：返回过期数据，保留原 ETag
+    controller.classify("/course").try_admit()
+    controller.classify("/course").try_admit()
+    stale = client.get("/course", headers={"Authorization": "Bearer a"})
+    assert stale.status_code == 200
+    assert stale.headers["X-Cache"] == "STALE"
+    assert stale.headers["ETag"] == fresh.headers["ETag"]
+    assert stale.json() == fresh.json()
+
+
+def test_shed_without_stale_returns_503(controller):
+    client = TestClient(make_app())
+    controller.classify("/course").try_admit()
+    controller.classify("/course").try_admit()
+    resp = client.get("/course", headers={"Authorization": "Bearer other"})
+    assert resp.status_code == 503
+    assert resp.json()["code"] == "OVERLOADED"
+    assert "Retry-After" in resp.headers
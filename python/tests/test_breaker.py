@@ -0,0 +1,66 @@
+"""
+CircuitBreaker 测试
+"""
+
+import time
+
+import pytest
+
+from app.core.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.core.errors import UpstreamUnavailable
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("jwxt", failure_threshold=3, open_seconds=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.on_failure()
+    assert breaker.state == CLOSED
+
+    breaker.on_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("jwxt", failure_threshold=2)
+    breaker.on_failure()
+    breaker.on_success()
+    breaker.on_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker("jwxt", failure_threshold=1, open_seconds=0.01, half_open_probes=1)
+    breaker.on_failure()
+    time.sleep(0.02)
+    assert breaker.state == HALF_OPEN
+
+    breaker.before_call()
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+    breaker.on_success()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_failure_reopens():
+    breaker = CircuitBreaker("jwxt", failure_threshold=5, open_seconds=0.01)
+    for _ in range(5):
+        breaker.on_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.on_failure()
+    assert breaker.state == OPEN
+    assert breaker.get_stats()["trips"] == 2
+
+
+def test_abandoned_probe_is_returned():
+    breaker = CircuitBreaker("jwxt", failure_threshold=1, open_seconds=0.01, half_open_probes=1)
+    breaker.on_failure()
+    time.sleep(0.02)
+    breaker.before_call()
+    breaker.on_abandon()
+    # 被放弃的探测不占名额，下一次调用仍可探测
+    breaker.before_call()
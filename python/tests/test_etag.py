@@ -0,0 +1,52 @@
+"""
+ETag / 304 测试
+"""
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services.etag import compute_etag, etag_response
+
+DATA = {"courses": [{"name": "高数", "week": [1, 2]}], "semester": "209"}
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/course")
+    async def course(request: Request):
+        return etag_response(request, DATA)
+
+    return TestClient(app)
+
+
+def test_etag_ignores_key_order():
+    assert compute_etag({"a": 1, "b": [1, 2]}) == compute_etag({"b": [1, 2], "a": 1})
+    assert compute_etag({"a": 1}) != compute_etag({"a": 2})
+
+
+def test_matching_if_none_match_returns_304():
+    client = make_client()
+    fresh = client.get("/course")
+    assert fresh.status_code == 200
+    assert fresh.json() == {"success": True, "data": DATA}
+    etag = fresh.headers["ETag"]
+
+    cached = client.get("/course", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    assert cached.headers["Cache-Control"] == "private, no-cache"
+
+
+def test_weak_and_listed_etags_match():
+    client = make_client()
+    etag = client.get("/course").headers["ETag"]
+    assert client.get("/course", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/course", headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_stale_etag_returns_body():
+    resp = make_client().get("/course", headers={"If-None-Match": '"stale"'})
+    assert resp.status_code == 200
+    assert resp.json()["data"] == DATA
@@ -0,0 +1,124 @@
+"""
+Gate / TokenBucket 测试
+"""
+
+import asyncio
+import time
+
+from app.core import limiter
+from app.core.limiter import Gate, TokenBucket
+
+
+def test_gate_hands_over_in_fifo_order():
+    async def main():
+        gate = Gate(1)
+        order = []
+
+        async def worker(i):
+            assert await gate.acquire()
+            order.append(i)
+            await asyncio.sleep(0.01)
+            gate.release()
+
+        await asyncio.gather(*(worker(i) for i in range(3)))
+        return order, gate.active, gate.waiting
+
+    order, active, waiting = asyncio.run(main())
+    assert order == [0, 1, 2]
+    assert active == 0
+    assert waiting == 0
+
+
+def test_gate_timeout_returns_false_and_keeps_count():
+    async def main():
+        gate = Gate(1)
+        assert await gate.acquire()
+        acquired = await gate.acquire(timeout=0.01)
+        waiting = gate.waiting
+        gate.release()
+        return acquired, waiting, gate.active
+
+    acquired, waiting, active = asyncio.run(main())
+    assert acquired is False
+    assert waiting == 0
+    assert active == 0
+
+
+def test_gate_release_skips_abandoned_waiter():
+    async def main():
+        gate = Gate(1)
+        assert await gate.acquire()
+        assert await gate.acquire(timeout=0.01) is False
+        gate.release()
+        # 名额没有交给已放弃的等待者
+        return await gate.acquire(timeout=0.1)
+
+    assert asyncio.run(main()) is True
+
+
+def test_gate_cancelled_waiter_does_not_leak():
+    async def main():
+        gate = Gate(1)
+        assert await gate.acquire()
+        task = asyncio.ensure_future(gate.acquire())
+        await asyncio.sleep(0)
+        gate.release()
+        # 交接已排队但任务先被取消：名额必须归还
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0)
+        return gate.active, gate.waiting
+
+    assert asyncio.run(main()) == (0, 0)
+
+
+def test_gate_timeout_after_hand_over_does_not_leak(monkeypatch):
+    async def late_wait_for(future, timeout):
+        # 模拟 3.12+：future 已拿到结果后 wait_for 仍抛出超时
+        await future
+        raise asyncio.TimeoutError
+
+    async def main():
+        gate = Gate(1)
+        assert await gate.acquire()
+        task = asyncio.ensure_future(gate.acquire(timeout=1))
+        await asyncio.sleep(0)
+        gate.release()
+        return await task, gate.active
+
+    monkeypatch.setattr(limiter.asyncio, "wait_for", late_wait_for)
+    acquired, active = asyncio.run(main())
+    assert acquired is False
+    assert active == 0
+
+
+def test_token_bucket_burst_then_paced():
+    async def main():
+        bucket = TokenBucket(rate=50, burst=2)
+        t0 = time.monotonic()
+        for _ in range(3):
+            assert await bucket.acquire()
+        return time.monotonic() - t0
+
+    elapsed = asyncio.run(main())
+    assert 0.01 <= elapsed < 0.5
+
+
+def test_token_bucket_refuses_when_wait_exceeds_timeout():
+    async def main():
+        bucket = TokenBucket(rate=1, burst=1)
+        assert await bucket.acquire(timeout=0)
+        return await bucket.acquire(timeout=0.1)
+
+    assert asyncio.run(main()) is False
+
+
+def test_token_bucket_zero_rate_is_unlimited():
+    async def main():
+        bucket = TokenBucket(rate=0, burst=1)
+        return all([await bucket.acquire(timeout=0) for _ in range(100)])
+
+    assert asyncio.run(main()) is True
@@ -0,0 +1,48 @@
+"""
+登录合并（跨 worker 等待）测试
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import upstream
+from app.core.errors import DeadlineExceeded
+from app.services import login_coordinator
+from app.services.login_coordinator import LoginCoordinator
+
+
+class HeldLockRedis:
+    """锁一直被另一个 worker 持有，记录执行命令的线程"""
+
+    def __init__(self):
+        self.threads = set()
+
+    def set(self, key, value, nx=False, px=None):
+        self.threads.add(threading.get_ident())
+        return False
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return "other-worker" if "lock" in key else None
+
+
+def test_wait_bounded_by_request_deadline(monkeypatch):
+    redis_client = HeldLockRedis()
+    monkeypatch.setattr(login_coordinator, "get_token_service", lambda: SimpleNamespace(redis=redis_client))
+    coordinator = LoginCoordinator(lock_ttl=60, poll_interval=0.05)
+
+    async def main():
+        with upstream.request_scope(timeout=0.3):
+            await coordinator.login("alice", "secret")
+
+    t0 = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+    assert time.monotonic() - t0 < 2
+    # 同步 Redis 命令不在事件循环线程上执行
+    assert redis_client.threads
+    assert threading.get_ident() not in redis_client.threads
@@ -0,0 +1,63 @@
+"""
+页面解析结果记忆测试
+"""
+
+from app.core.parse_memo import ParseMemo
+
+
+def counting_parser(calls):
+    def parse(html):
+        calls.append(html)
+        return {"rows": [html]}
+    return parse
+
+
+def test_same_page_parsed_once():
+    memo = ParseMemo(max_entries=8)
+    calls = []
+    parse = counting_parser(calls)
+    first = memo.get_or_parse("course", 1, "<table>a</table>", parse)
+    second = memo.get_or_parse("course", 1, "<table>a</table>", parse)
+    assert first == second == {"rows": ["<table>a</table>"]}
+    assert len(calls) == 1
+    assert memo.get_stats()["parsers"]["course"] == {"hits": 1, "misses": 1}
+
+
+def test_results_are_copies():
+    memo = ParseMemo(max_entries=8)
+    parse = counting_parser([])
+    memo.get_or_parse("course", 1, "page", parse)["rows"].append("mutated")
+    assert memo.get_or_parse("course", 1, "page", parse) == {"rows": ["page"]}
+
+
+def test_version_and_parser_separate_entries():
+    memo = ParseMemo(max_entries=8)
+    calls = []
+    parse = counting_parser(calls)
+    memo.get_or_parse("course", 1, "page", parse)
+    memo.get_or_parse("course", 2, "page", parse)
+    memo.get_or_parse("grade", 1, "page", parse)
+    assert len(calls) == 3
+
+
+def test_lru_eviction():
+    memo = ParseMemo(max_entries=2)
+    calls = []
+    parse = counting_parser(calls)
+    memo.get_or_parse("course", 1, "a", parse)
+    memo.get_or_parse("course", 1, "b", parse)
+    memo.get_or_parse("course", 1, "a", parse)  # a 变为最近使用
+    memo.get_or_parse("course", 1, "c", parse)  # 淘汰 b
+    memo.get_or_parse("course", 1, "a", parse)
+    memo.get_or_parse("course", 1, "b", parse)
+    assert calls == ["a", "b", "c", "b"]
+    assert memo.get_stats()["entries"] == 2
+
+
+def test_disabled_memo_always_parses():
+    memo = ParseMemo(max_entries=0)
+    calls = []
+    parse = counting_parser(calls)
+    memo.get_or_parse("course", 1, "page", parse)
+    memo.get_or_parse("course", 1, "page", parse)
+    assert len(calls) == 2
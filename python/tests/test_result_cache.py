@@ -0,0 +1,139 @@
+"""
+解析结果缓存测试
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import result_cache
+from app.services.result_cache import ResultCache
+
+
+class FakeRedis:
+    """ResultCache 用到的 Redis 命令"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] < time.time()):
+            return None
+        return entry[0]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = (value, time.time() + ttl)
+
+    def ttl(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return -2
+        return -1 if entry[1] is None else int(entry[1] - time.time())
+
+    def incr(self, key):
+        value = int(self.get(key) or 0) + 1
+        expires = self.data.get(key, (None, None))[1]
+        self.data[key] = (str(value), expires)
+        return value
+
+    def expire(self, key, ttl):
+        if key in self.data:
+            self.data[key] = (self.data[key][0], time.time() + ttl)
+
+
+def use_redis(monkeypatch, redis_client):
+    monkeypatch.setattr(result_cache, "get_token_service", lambda: SimpleNamespace(redis=redis_client))
+
+
+def loader(results, calls):
+    async def load():
+        calls.append(1)
+        return results.pop(0)
+    return load
+
+
+def test_memory_hit_and_refresh(monkeypatch):
+    use_redis(monkeypatch, None)
+    cache = ResultCache({"grade": 60})
+    calls = []
+    load = loader([{"success": True, "grades": [1]}, {"success": True, "grades": [2]}], calls)
+
+    async def main():
+        first = await cache.get_or_load("grade", "s1", "209", load)
+        second = await cache.get_or_load("grade", "s1", "209", load)
+        refreshed = await cache.get_or_load("grade", "s1", "209", load, refresh=True)
+        return first, second, refreshed
+
+    first, second, refreshed = asyncio.run(main())
+    assert first == second == {"success": True, "grades": [1]}
+    assert refreshed["grades"] == [2]
+    assert len(calls) == 2
+
+
+def test_failures_are_not_cached(monkeypatch):
+    use_redis(monkeypatch, None)
+    cache = ResultCache({"exam": 60})
+    calls = []
+    load = loader([{"success": False, "error": "x"}, {"success": True, "exams": [1]}], calls)
+
+    async def main():
+        await cache.get_or_load("exam", "s1", None, load)
+        return await cache.get_or_load("exam", "s1", None, load)
+
+    assert asyncio.run(main())["success"] is True
+    assert len(calls) == 2
+
+
+def test_empty_results_use_empty_ttl(monkeypatch):
+    use_redis(monkeypatch, None)
+    cache = ResultCache({"course": 3600}, empty_ttl=0)
+    calls = []
+    load = loader([{"success": True, "courses": []}, {"success": True, "courses": [1]}], calls)
+
+    async def main():
+        await cache.get_or_load("course", "s1", "209", load)
+        return await cache.get_or_load("course", "s1", "209", load)
+
+    assert asyncio.run(main())["courses"] == [1]
+
+
+@pytest.mark.parametrize("shared_redis", [False, True])
+def test_invalidate_reaches_other_workers(monkeypatch, shared_redis):
+    """一个 worker 失效后，另一个 worker 的进程内缓存也不再命中"""
+    use_redis(monkeypatch, FakeRedis() if shared_redis else None)
+    worker_a = ResultCache({"evaluation": 300})
+    worker_b = ResultCache({"evaluation": 300}) if shared_redis else worker_a
+    calls = []
+    load = loader([
+        {"success": True, "evaluations": [1, 2]},
+        {"success": True, "evaluations": [2]},
+    ], calls)
+
+    async def main():
+        await worker_b.get_or_load("evaluation", "s1", None, load)
+        assert (await worker_b.get_or_load("evaluation", "s1", None, load))["evaluations"] == [1, 2]
+        worker_a.invalidate("evaluation", "s1")
+        return await worker_b.get_or_load("evaluation", "s1", None, load)
+
+    assert asyncio.run(main())["evaluations"] == [2]
+    assert len(calls) == 2
+
+
+def test_invalidate_keeps_other_students_and_datasets(monkeypatch):
+    use_redis(monkeypatch, FakeRedis())
+    cache = ResultCache({"evaluation": 300, "grade": 300})
+    calls = []
+    load = loader([{"success": True, "evaluations": [1]}, {"success": True, "grades": [1]}], calls)
+
+    async def main():
+        await cache.get_or_load("evaluation", "s2", None, load)
+        await cache.get_or_load("grade", "s1", "209", load)
+        cache.invalidate("evaluation", "s1")
+        await cache.get_or_load("evaluation", "s2", None, load)
+        await cache.get_or_load("grade", "s1", "209", load)
+
+    asyncio.run(main())
+    assert len(calls) == 2
@@ -0,0 +1,83 @@
+"""
+RetryPolicy 测试
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from app.core.retry import RetryPolicy
+
+
+def response(status_code: int) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status_code
+    return resp
+
+
+def run(policy: RetryPolicy, outcomes, scope=None, remaining=lambda: None):
+    """依次返回或抛出 outcomes 中的结果，返回 (最终结果, 调用次数)"""
+    outcomes = list(outcomes)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    result = asyncio.run(policy.run(attempt, scope, remaining))
+    return result, len(calls)
+
+
+def test_retries_connection_error_then_recovers():
+    policy = RetryPolicy(base_delay=0)
+    result, calls = run(policy, [requests.ConnectionError(), response(200)])
+    assert result.status_code == 200
+    assert calls == 2
+    assert policy.get_stats()["recovered"] == 1
+
+
+def test_retries_retryable_status_until_max_attempts():
+    policy = RetryPolicy(base_delay=0, max_attempts=3, per_request=5)
+    result, calls = run(policy, [response(502), response(503), response(504)])
+    assert result.status_code == 504
+    assert calls == 3
+
+
+def test_does_not_retry_other_status():
+    result, calls = run(RetryPolicy(base_delay=0), [response(500)])
+    assert result.status_code == 500
+    assert calls == 1
+
+
+def test_disabled_policy_raises_immediately():
+    with pytest.raises(requests.Timeout):
+        run(RetryPolicy(enabled=False), [requests.Timeout()])
+
+
+def test_per_request_budget():
+    scope = SimpleNamespace(retries=0)
+    policy = RetryPolicy(base_delay=0, max_attempts=10, per_request=1)
+    result, calls = run(policy, [response(502), response(502), response(200)], scope=scope)
+    assert result.status_code == 502
+    assert calls == 2
+    assert scope.retries == 1
+
+
+def test_process_token_budget_stops_retries():
+    policy = RetryPolicy(base_delay=0, max_attempts=10, per_request=100, max_tokens=4)
+    # 每次失败扣一个令牌，令牌不高于一半后不再重试
+    result, calls = run(policy, [response(502)] * 10)
+    assert result.status_code == 502
+    assert calls == 2
+    assert policy.get_stats()["budget_denied"] == 1
+
+
+def test_no_retry_when_deadline_too_close():
+    policy = RetryPolicy(base_delay=0)
+    with pytest.raises(requests.ConnectionError):
+        run(policy, [requests.ConnectionError(), response(200)], remaining=lambda: 0.5)
@@ -0,0 +1,71 @@
+"""
+全局学期目录测试
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from app.core import upstream
+from app.services import semester_catalog
+from app.services.semester_catalog import SemesterCatalog
+
+SEMESTERS = [{"id": "209", "name": "2024-2025-1"}]
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """记录每次刷新时所在的请求作用域与舱壁"""
+    calls = []
+
+    class FakeSemesterService:
+        def __init__(self, session):
+            pass
+
+        async def get_available(self, probe_current=True):
+            calls.append((upstream.current_scope(), upstream._current_bulkhead.get()))
+            return {"success": True, "semesters": SEMESTERS, "current_semester": "209"}
+
+    monkeypatch.setattr(semester_catalog, "SemesterService", FakeSemesterService)
+    monkeypatch.setattr(semester_catalog, "get_token_service", lambda: SimpleNamespace(redis=None))
+    return calls
+
+
+def test_first_get_refreshes_then_hits(refreshes):
+    catalog = SemesterCatalog(ttl=3600)
+
+    async def main():
+        first = await catalog.get(requests.Session())
+        second = await catalog.get(requests.Session())
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first is second
+    assert first["current_semester"] == "209"
+    assert len(refreshes) == 1
+    assert catalog.get_stats()["hits"] == 1
+
+
+def test_stale_data_refreshes_in_own_scope(refreshes):
+    catalog = SemesterCatalog(ttl=3600)
+    stale = {"semesters": SEMESTERS, "current_semester": "208", "fetched_at": time.time() - 7200}
+    catalog._data = stale
+
+    async def main():
+        with upstream.request_scope(timeout=0.01) as scope, upstream.bulkhead("evaluation"):
+            returned = await catalog.get(requests.Session())
+        await catalog._refreshing
+        return scope, returned
+
+    scope, returned = asyncio.run(main())
+    # 先返回旧数据，后台刷新不继承触发请求的作用域和舱壁
+    assert returned is stale
+    assert len(refreshes) == 1
+    refresh_scope, refresh_bulkhead = refreshes[0]
+    assert refresh_scope is not scope
+    assert refresh_bulkhead == "read"
+    assert catalog.get_stats()["current_semester"] == "209"
+    assert catalog.get_stats()["stale_hits"] == 1
@@ -0,0 +1,77 @@
+"""
+SingleFlight 测试
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 1}
+
+    async def main():
+        flights = SingleFlight("test")
+        results = await asyncio.gather(*(flights.do("key", load) for _ in range(5)))
+        return results, flights.get_stats()
+
+    results, stats = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert stats["executed"] == 1
+    assert stats["shared"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_completed_call_is_not_cached():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        flights = SingleFlight("test")
+        return await flights.do("key", load), await flights.do("key", load)
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+def test_errors_are_shared_and_forgotten():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        flights = SingleFlight("test")
+        results = await asyncio.gather(flights.do("key", fail), flights.do("key", fail), return_exceptions=True)
+        return results, flights.get_stats()["in_flight"]
+
+    results, in_flight = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert in_flight == 0
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def load():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        flights = SingleFlight("test")
+        first = asyncio.ensure_future(flights.do("key", load))
+        second = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
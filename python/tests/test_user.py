@@ -0,0 +1,43 @@
+"""
+UserService 部分数据测试
+"""
+
+import asyncio
+
+import pytest
+import requests
+
+from app.core import upstream, user
+from app.core.errors import DeadlineExceeded, UpstreamUnavailable
+from app.core.user import UserService
+
+WELCOME = "<html>第3周 2024-2025学年第1学期</html>"
+
+
+def fake_get(fail_paths, error):
+    async def get(session, url, **kwargs):
+        if any(path in url for path in fail_paths):
+            raise error
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = WELCOME.encode()
+        return resp
+    return get
+
+
+def test_upstream_error_marks_part_partial(monkeypatch):
+    monkeypatch.setattr(upstream, "get", fake_get(["stdDetail"], DeadlineExceeded("x")))
+    monkeypatch.setattr(user.upstream, "memoize", lambda key, load: load())
+
+    info = asyncio.run(UserService(requests.Session()).get_info())
+    assert info["success"] is True
+    assert "detail" in info["partial"]
+    assert "current_week" not in info["partial"]
+
+
+def test_all_parts_failing_raises(monkeypatch):
+    monkeypatch.setattr(upstream, "get", fake_get(["/"], UpstreamUnavailable("down")))
+    monkeypatch.setattr(user.upstream, "memoize", lambda key, load: load())
+
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(UserService(requests.Session()).get_info())